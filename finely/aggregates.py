@@ -0,0 +1,78 @@
+from collections import defaultdict
+
+# --- Aggregates ---
+# Running sums kept next to the data so dashboard and reports never rescan transactions.
+KINDS = ("income", "expenses")
+
+class Aggregates:
+    def __init__(self):
+        self.totals = {"income": 0.0, "expenses": 0.0}
+        self.monthly = defaultdict(lambda: {"income": 0.0, "expenses": 0.0})
+        self.by_category = {kind: defaultdict(float) for kind in KINDS}
+        self.by_month_category = {kind: defaultdict(float) for kind in KINDS}
+        # bumped on every change so consumers can check staleness in O(1)
+        self.version = 0
+        self.kind_versions = {kind: 0 for kind in KINDS}
+
+    def add(self, kind, amount, category, month):
+        self.version += 1
+        self.kind_versions[kind] += 1
+        self.totals[kind] += amount
+        self.monthly[month][kind] += amount
+        self.by_category[kind][category] += amount
+        self.by_month_category[kind][(month, category)] += amount
+
+    def add_tx(self, kind, tx, row=None):
+        self.add(kind, tx["amount"], tx["category"], tx["date"][:7])
+
+    def merge(self, other):
+        # fold a batch in with a single version bump
+        self.version += 1
+        for kind in KINDS:
+            if other.kind_versions[kind]:
+                self.kind_versions[kind] += 1
+            self.totals[kind] += other.totals[kind]
+            for category, amount in other.by_category[kind].items():
+                self.by_category[kind][category] += amount
+            for key, amount in other.by_month_category[kind].items():
+                self.by_month_category[kind][key] += amount
+        for month, sums in other.monthly.items():
+            for kind in KINDS:
+                self.monthly[month][kind] += sums[kind]
+
+    def recategorize(self, kind, old, new):
+        # move old's totals onto new (a rename, or a merge if new already has some)
+        self.version += 1
+        self.kind_versions[kind] += 1
+        if old in self.by_category[kind]:
+            self.by_category[kind][new] += self.by_category[kind].pop(old)
+        by_month = self.by_month_category[kind]
+        for month, category in [key for key in by_month if key[1] == old]:
+            by_month[(month, new)] += by_month.pop((month, category))
+
+    def copy(self):
+        # plain dicts, for readers outside the lock the live aggregates are updated under
+        agg = Aggregates()
+        agg.totals = dict(self.totals)
+        agg.monthly = {month: dict(sums) for month, sums in self.monthly.items()}
+        agg.by_category = {kind: dict(sums) for kind, sums in self.by_category.items()}
+        agg.by_month_category = {kind: dict(sums) for kind, sums in self.by_month_category.items()}
+        agg.version = self.version
+        agg.kind_versions = dict(self.kind_versions)
+        return agg
+
+    @classmethod
+    def from_data(cls, data):
+        agg = cls()
+        for kind in KINDS:
+            for tx in data[kind]:
+                agg.add_tx(kind, tx)
+        return agg
+
+    @classmethod
+    def from_sums(cls, rows):
+        # rows of (kind, month, category, amount), e.g. from a SQL GROUP BY
+        agg = cls()
+        for kind, month, category, amount in rows:
+            agg.add(kind, amount, category, month)
+        return agg
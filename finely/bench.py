@@ -0,0 +1,237 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# --- Benchmarks ---
+# python -m finely.bench [--sizes 1k,100k,1m,5m] [--output results.json]
+# Generates a synthetic data.json per size in a scratch data dir, then times the data paths
+# behind each screen. Headless: Flet is never started and charts are only rendered if
+# matplotlib is installed. Results are JSON so runs can be diffed between releases.
+# Storage mode and columnar layout follow FINELY_STORAGE / FINELY_COLUMNAR as usual.
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+PAGE_SIZE = 50
+INCOME_SHARE = 0.1
+END_DATE = date(2025, 12, 31)
+DAYS = 5 * 365
+
+INCOME_LABELS = ["Acme Corp payroll", "Client invoice", "Dividend", "Birthday gift", "Refund", "Side project"]
+EXPENSE_LABELS = [f"{shop} #{i}" for shop in ("Market", "Cafe", "Pharmacy", "Fuel", "Cinema", "Bookstore",
+                                                "Bakery", "Metro", "Power bill", "Gym", "Pizza", "Hardware")
+                  for i in range(1, 41)]
+
+def generate_dataset(path, n, seed=42):
+    # streamed straight to disk so generating 5M rows never holds them in memory
+    from finely.storage import default_data
+    rng = random.Random(seed)
+    n_income = int(n * INCOME_SHARE)
+    income_cats = default_data["categories"]["income"]
+    expense_cats = default_data["categories"]["expenses"]
+
+    def day():
+        return (END_DATE - timedelta(days=rng.randrange(DAYS))).isoformat()
+
+    def write_list(file, count, make):
+        for i in range(count):
+            if i:
+                file.write(", ")
+            file.write(json.dumps(make()))
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{"income": [')
+        write_list(file, n_income, lambda: {
+            "amount": round(rng.lognormvariate(7, 0.8), 2),
+            "source": rng.choice(INCOME_LABELS),
+            "category": rng.choice(income_cats),
+            "date": day(),
+        })
+        file.write('], "expenses": [')
+        write_list(file, n - n_income, lambda: {
+            "amount": round(rng.lognormvariate(3.2, 1.1), 2),
+            "description": rng.choice(EXPENSE_LABELS),
+            "category": rng.choice(expense_cats),
+            "date": day(),
+        })
+        file.write('], ')
+        settings = {key: value for key, value in default_data.items() if key not in ("income", "expenses")}
+        file.write(json.dumps(settings)[1:])
+
+def timed(fn, repeat=1):
+    # best of `repeat` runs, in milliseconds, plus the last result
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3), result
+
+def chart_renderers():
+    # (name, builder) pairs for whatever chart backends are importable here
+    renderers = []
+    try:
+        import matplotlib  # noqa: F401
+        from finely import charts
+        from finely.main import get_colors
+    except ImportError:
+        pass
+    else:
+        colors = get_colors("light")
+        renderers += [
+            ("chart_income_pie", lambda d: charts.render_income_pie(d[1], "light", colors)),
+            ("chart_expense_pie", lambda d: charts.render_expense_pie(d[2], "light", colors)),
+            ("chart_monthly_bar", lambda d: charts.render_monthly_bar(d[0], "light", colors)),
+            ("chart_net_balance_line", lambda d: charts.render_net_balance_line(d[0], "light", colors)),
+        ]
+    try:
+        from finely import flet_charts
+    except ImportError:
+        pass
+    else:
+        renderers += [
+            ("native_income_pie", lambda d: flet_charts.income_pie(d[1])),
+            ("native_expense_pie", lambda d: flet_charts.expense_pie(d[2])),
+            ("native_monthly_bar", lambda d: flet_charts.monthly_bar(d[0])),
+            ("native_net_balance_line", lambda d: flet_charts.net_balance_line(d[0])),
+        ]
+    return renderers
+
+def run_size(n, repeat, log):
+    from finely import storage
+    from finely.storage import (
+        DATA_FILE, load_data, save_data, transaction_totals, report_summary,
+        find_transactions, get_index, get_aggregates, add_transaction
+    )
+    timings = {}
+
+    def step(name, fn, times=repeat):
+        timings[name], result = timed(fn, times)
+        log(f"  {name}: {timings[name]:.1f} ms")
+        return result
+
+    step("generate", lambda: generate_dataset(DATA_FILE, n), 1)
+    file_size = os.path.getsize(DATA_FILE)
+
+    # the first load also covers the one-off SQLite migration
+    data = step("load_data_first", load_data, 1)
+    del data
+    storage.index_cache.clear()
+    gc.collect()
+
+    def load():
+        storage.index_cache.clear()
+        return load_data()
+
+    data = step("load_data", load)
+    step("save_data", lambda: save_data(data))
+
+    # dashboard: totals, then the first page of the transaction list for each control
+    step("totals_cold", lambda: transaction_totals(data), 1)
+    step("totals", lambda: transaction_totals(data))
+    if storage.sqlite_store_conn(data) is None:
+        # SQLite answers these with its own indexes
+        step("search_index_build", lambda: get_index(data, "search"), 1)
+        step("order_index_build", lambda: get_index(data, "order"), 1)
+    queries = {
+        "list_all": ("all", "", "newest"),
+        "list_income": ("income", "", "newest"),
+        "list_expense_by_amount": ("expense", "", "amount_high"),
+        "list_oldest": ("all", "", "oldest"),
+        "search_short": ("all", "ca", "newest"),
+        "search": ("all", "market", "newest"),
+        "search_sorted": ("expense", "pizza", "amount_low"),
+    }
+    for name, (tx_type, query, sort) in queries.items():
+        step(name, lambda q=(tx_type, query, sort): find_transactions(data, *q)[:PAGE_SIZE])
+
+    # reports
+    summary = step("report_summary", lambda: report_summary(data))
+    chart_data = tuple(json.loads(json.dumps(part)) for part in summary)
+    for name, render in chart_renderers():
+        step(name, lambda r=render: r(chart_data), 1)
+
+    # one change end to end, then the O(1) staleness check the chart cache uses
+    tx = {"amount": 12.5, "description": "Benchmark", "category": "Food", "date": END_DATE.isoformat()}
+    step("add_transaction", lambda: add_transaction(data, "expenses", dict(tx)), 1)
+    step("data_version", lambda: get_aggregates(data).version)
+
+    # the write-behind save of that add must land before the scratch dir is cleared, or it
+    # would write this size's data over the next one
+    storage.flush_saves()
+    conn = storage.sqlite_store_conn(data)
+    if conn is not None:
+        conn.close()
+    storage.index_cache.clear()
+    return {"transactions": n, "data_file_bytes": file_size, "timings_ms": timings}
+
+def clear_dir(path):
+    for name in os.listdir(path):
+        full = os.path.join(path, name)
+        if os.path.isdir(full):
+            shutil.rmtree(full)
+        else:
+            os.remove(full)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m finely.bench", description="Time Finely's data paths on synthetic histories.")
+    parser.add_argument("--sizes", default=",".join(SIZES), help=f"comma-separated, from {', '.join(SIZES)} or a plain count")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per step; the best is reported (default: 3)")
+    parser.add_argument("--output", help="write results here instead of stdout")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        sizes = [SIZES[s.lower()] if s.lower() in SIZES else int(s) for s in args.sizes.split(",")]
+    except ValueError:
+        print(f"Error: unknown size in '{args.sizes}'", file=sys.stderr)
+        return 1
+    if "finely.storage" in sys.modules:
+        print("Error: run the benchmark in a fresh interpreter (python -m finely.bench)", file=sys.stderr)
+        return 1
+
+    def log(message):
+        print(message, file=sys.stderr, flush=True)
+
+    scratch = tempfile.mkdtemp(prefix="finely-bench-")
+    # storage reads its data dir at import, so point it at the scratch dir first
+    os.environ["FINELY_DATA_DIR"] = scratch
+    try:
+        from finely.storage import STORAGE_MODE, COLUMNAR
+        from finely import columnar
+        results = []
+        for n in sizes:
+            log(f"{n:,} transactions ({STORAGE_MODE}{', columnar' if COLUMNAR else ''})")
+            results.append(run_size(n, args.repeat, log))
+            clear_dir(scratch)
+            gc.collect()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "storage": STORAGE_MODE,
+        "columnar": COLUMNAR,
+        "numpy": columnar.np is not None,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from finely.columnar import LABEL_KEYS, StringTable, TransactionColumns, column_bytes
+
+# --- Binary Data File ---
+# "binary" storage mode: DATA_DIR/data.fnly instead of data.json. Layout (little-endian):
+#   header   <8s magic> <H version> <H flags> <I section count>
+#   sections <32s name> <Q offset> <Q length> per section
+#   then the section bodies, each starting on an 8-byte boundary:
+#     "meta"                JSON settings (everything but the transactions)
+#     "<kind>.amount"       float64[n]
+#     "<kind>.day"          int32[n] date ordinals
+#     "<kind>.category"     uint32[n] ids into "<kind>.categories"
+#     "<kind>.label"        uint32[n] ids into "<kind>.labels"
+#     "<kind>.categories"   string table: <I count> uint32 offsets[count + 1] utf-8 bytes
+#     "<kind>.labels"       same
+# Opening maps the file and reads the header and "meta" only; each column is copied out of
+# the map the first time something touches it. Readers skip sections they don't know, so
+# new ones can be added without a version bump; a layout change bumps VERSION.
+
+MAGIC = b"FNLYDATA"
+VERSION = 1
+HEADER = struct.Struct("<8sHHI")
+SECTION = struct.Struct("<32sQQ")
+KINDS = ("income", "expenses")
+COLUMNS = {"amount": "d", "day": "i", "category": "I", "label": "I"}
+TABLES = ("categories", "labels")
+
+def pad(offset):
+    return (offset + 7) & ~7
+
+def string_table_bytes(values):
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("I", [0])
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return struct.pack("<I", len(values)) + column_bytes(offsets) + b"".join(encoded)
+
+def write_binary(data, path):
+    # temp file + rename like write_snapshot; plain lists are packed through TransactionColumns
+    sections = [("meta", json.dumps({k: v for k, v in data.items() if k not in KINDS}).encode("utf-8"))]
+    for kind in KINDS:
+        txs = data[kind]
+        if not isinstance(txs, TransactionColumns):
+            txs = TransactionColumns(kind, txs)
+        for name in COLUMNS:
+            sections.append((f"{kind}.{name}", column_bytes(getattr(txs, name))))
+        for name in TABLES:
+            sections.append((f"{kind}.{name}", string_table_bytes(getattr(txs, name).values)))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        offset = pad(HEADER.size + SECTION.size * len(sections))
+        table = []
+        for name, body in sections:
+            table.append(SECTION.pack(name.encode("ascii"), offset, len(body)))
+            offset = pad(offset + len(body))
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(sections)) + b"".join(table))
+        for _, body in sections:
+            file.write(b"\0" * (pad(file.tell()) - file.tell()))
+            file.write(body)
+    os.replace(tmp_path, path)
+
+class BinaryFile:
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            # an empty file can't be mapped; the header check below rejects it either way
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{path} is not a Finely data file")
+        magic, version, _, count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Finely data file")
+        if version > VERSION:
+            raise ValueError(f"{path} was written by a newer Finely (format {version})")
+        self.sections = {}
+        for i in range(count):
+            name, offset, length = SECTION.unpack_from(self.map, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+
+    def read(self, name):
+        offset, length = self.sections[name]
+        return self.map[offset:offset + length]
+
+    def column(self, kind, name):
+        values = array(COLUMNS[name])
+        offset, length = self.sections[f"{kind}.{name}"]
+        with memoryview(self.map) as view, view[offset:offset + length] as part:
+            values.frombytes(part)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def strings(self, kind, name):
+        body = self.read(f"{kind}.{name}")
+        count, = struct.unpack_from("<I", body)
+        offsets = array("I")
+        offsets.frombytes(body[4:8 + 4 * count])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        blob = body[8 + 4 * count:]
+        table = StringTable()
+        table.values = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+        table.ids = {value: i for i, value in enumerate(table.values)}
+        return table
+
+    def rows(self, kind):
+        return self.sections[f"{kind}.amount"][1] // 8
+
+class MappedColumns(TransactionColumns):
+    # TransactionColumns whose columns and string tables stay in the mapped file until first
+    # touched; once everything is decoded the map is let go
+    LAZY = (*COLUMNS, *TABLES)
+
+    def __init__(self, kind, source):
+        self.kind = kind
+        self.label_key = LABEL_KEYS[kind]
+        self.date_strings = {}
+        self.source = source
+        self.rows = source.rows(kind)
+
+    def __getattr__(self, name):
+        # only reached for attributes not decoded yet
+        if name not in MappedColumns.LAZY or self.__dict__.get("source") is None:
+            raise AttributeError(name)
+        source = self.source
+        value = source.column(self.kind, name) if name in COLUMNS else source.strings(self.kind, name)
+        setattr(self, name, value)
+        if all(lazy in self.__dict__ for lazy in MappedColumns.LAZY):
+            self.source = None
+        return value
+
+    def __len__(self):
+        amount = self.__dict__.get("amount")
+        return self.rows if amount is None else len(amount)
+
+def read_binary(path):
+    # -> data dict with MappedColumns for both kinds; nothing but the settings is decoded yet
+    source = BinaryFile(path)
+    data = json.loads(source.read("meta").decode("utf-8"))
+    for kind in KINDS:
+        data[kind] = MappedColumns(kind, source)
+    return data
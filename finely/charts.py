@@ -0,0 +1,118 @@
+from io import BytesIO
+
+# --- Chart Rendering ---
+# Pure functions on plain data that return PNG bytes. They use the object-oriented Figure API
+# (no pyplot state machine) so they can run in worker processes without touching the UI.
+# matplotlib is imported on first render, so importing this module costs nothing at startup.
+
+def chart_style(theme, colors):
+    return {
+        'font.family': 'Vazirmatn',
+        'font.sans-serif': ['Vazirmatn', 'Arial', 'Calibri', 'Helvetica'],
+        'axes.titleweight': 'bold',
+        'axes.titlesize': 13,
+        'axes.labelsize': 10,
+        'axes.labelweight': 'bold',
+        'axes.edgecolor': '#555555' if theme == "dark" else '#333333',
+        'axes.linewidth': 0.8,
+        'axes.facecolor': colors["card"],
+        'figure.facecolor': colors["card"],
+        'grid.color': colors["border"],
+        'grid.linestyle': '--',
+        'grid.alpha': 0.4,
+        'xtick.labelsize': 9,
+        'ytick.labelsize': 9,
+        'text.color': colors["text"],
+        'axes.labelcolor': colors["text"],
+        'xtick.color': colors["text"],
+        'ytick.color': colors["text"],
+        'savefig.transparent': False,
+        'savefig.pad_inches': 0.3,
+        'savefig.dpi': 120,
+        'lines.linewidth': 2.5
+    }
+
+def styled(theme, colors):
+    import matplotlib
+    return matplotlib.rc_context(chart_style(theme, colors))
+
+def new_figure(figsize):
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+def figure_to_png(fig):
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=100, bbox_inches='tight')
+    return buf.getvalue()
+
+def render_income_pie(income_data, theme, colors):
+    with styled(theme, colors):
+        labels = list(income_data.keys())
+        sizes = list(income_data.values())
+        fig = new_figure((5, 4))
+        ax = fig.add_subplot()
+        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
+               colors=["#66B2FF", "#99FF99", "#FFD700", "#FF9999", "#C2C2F0"][:len(labels)])
+        ax.set_title("Income Distribution by Category", fontsize=12, fontweight='bold', pad=20)
+        return figure_to_png(fig)
+
+def render_expense_pie(expense_data, theme, colors):
+    with styled(theme, colors):
+        labels = list(expense_data.keys())
+        sizes = list(expense_data.values())
+        fig = new_figure((5, 4))
+        ax = fig.add_subplot()
+        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
+               colors=["#FF9999", "#FFCC99", "#FF99CC", "#FF6666", "#C2C2F0", "#FFB3E6", "#D93025"][:len(labels)])
+        ax.set_title("Expense Distribution by Category", fontsize=12, fontweight='bold', pad=20)
+        return figure_to_png(fig)
+
+def render_monthly_bar(monthly_data, theme, colors):
+    with styled(theme, colors):
+        months = sorted(monthly_data.keys())
+        month_labels = [f"{m[5:]}/{m[:4][2:]}" for m in months]
+        incomes = [monthly_data[m]["income"] for m in months]
+        expenses = [monthly_data[m]["expenses"] for m in months]
+
+        x = range(len(months))
+        width = 0.35
+
+        fig = new_figure((7, 4))
+        ax = fig.add_subplot()
+        ax.bar([i - width/2 for i in x], incomes, width, label="Income", color=colors["accent"], alpha=0.8)
+        ax.bar([i + width/2 for i in x], expenses, width, label="Expenses", color=colors["danger"], alpha=0.8)
+        ax.set_xlabel("Month (MM/YY)", fontsize=10)
+        ax.set_ylabel("Amount", fontsize=10)
+        ax.set_title("Monthly Income vs Expenses", fontsize=12, fontweight='bold', pad=15)
+        ax.set_xticks(list(x))
+        ax.set_xticklabels(month_labels, rotation=0, fontsize=9)
+        ax.tick_params(axis='y', labelsize=9)
+        ax.legend(fontsize=10)
+        ax.grid(axis='y', linestyle='--', alpha=0.4)
+        fig.tight_layout(pad=2.0)
+        return figure_to_png(fig)
+
+def render_net_balance_line(monthly_data, theme, colors):
+    with styled(theme, colors):
+        months = sorted(monthly_data.keys())
+        month_labels = [f"{m[5:]}/{m[:4][2:]}" for m in months]
+        balances = [monthly_data[m]["income"] - monthly_data[m]["expenses"] for m in months]
+
+        fig = new_figure((7, 4))
+        ax = fig.add_subplot()
+        ax.plot(month_labels, balances, marker='o', linewidth=2.5, color=colors["primary"], label="Net Balance")
+
+        for i, bal in enumerate(balances):
+            color = colors["accent"] if bal >= 0 else colors["danger"]
+            ax.plot(i, bal, 'o', color=color)
+            ax.text(i, bal + (10 if bal >= 0 else -15), f"{bal:,.0f}", fontsize=8, ha='center', va='center')
+
+        ax.axhline(0, color=colors["text_light"], linewidth=1, linestyle='--')
+        ax.set_xlabel("Month (MM/YY)", fontsize=10)
+        ax.set_ylabel("Net Balance", fontsize=10)
+        ax.set_title("Monthly Net Balance Trend", fontsize=12, fontweight='bold', pad=15)
+        ax.tick_params(axis='x', labelrotation=0, labelsize=9)
+        ax.tick_params(axis='y', labelsize=9)
+        ax.grid(axis='y', linestyle='--', alpha=0.5)
+        fig.tight_layout(pad=2.0)
+        return figure_to_png(fig)
@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from finely.storage import (
+    load_data, add_transaction, delete_category, rename_category, category_in_use,
+    transaction_totals, report_summary, range_summary, get_aggregates
+)
+
+# --- Headless CLI ---
+# `finely` alone opens the app; with a subcommand it works on the same data without ever
+# importing flet or matplotlib, so it runs without a display and starts in milliseconds.
+
+KIND_BY_TYPE = {"income": "income", "expense": "expenses"}
+LABEL_BY_TYPE = {"income": "source", "expense": "description"}
+
+def fail(message):
+    print(f"Error: {message}", file=sys.stderr)
+    return 1
+
+def fmt(n):
+    return f"{n:,.2f}"
+
+def parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+
+def make_tx(tx_type, amount, category, label, date):
+    amount = float(amount)
+    label = (label or "").strip()
+    if not label or not category or amount <= 0:
+        raise ValueError("Invalid input")
+    return {
+        "amount": amount,
+        LABEL_BY_TYPE[tx_type]: label,
+        "category": category,
+        "date": parse_date(date) if date else datetime.now().strftime("%Y-%m-%d"),
+    }
+
+# --- Commands ---
+def cmd_add(args):
+    data = load_data()
+    kind = KIND_BY_TYPE[args.type]
+    if args.category not in data["categories"][kind]:
+        return fail(f"unknown {args.type} category '{args.category}' "
+                    f"(choose from: {', '.join(data['categories'][kind])})")
+    try:
+        tx = make_tx(args.type, args.amount, args.category, args.label, args.date)
+    except ValueError as e:
+        return fail(e)
+    add_transaction(data, kind, tx)
+    print(f"Added {args.type}: {fmt(tx['amount'])} {tx['category']} ({tx['date']})")
+    return 0
+
+def cmd_import(args):
+    from finely.importer import READERS, import_rows
+    name = args.file.lower()
+    fmt_name = args.format or ("ofx" if name.endswith((".ofx", ".qfx")) else "columns" if name.endswith(".fcol") else "csv")
+    if fmt_name == "csv":
+        try:
+            mapping = dict(item.split("=", 1) for item in args.map)
+        except ValueError:
+            return fail("--map expects field=column")
+        rows = READERS["csv"](args.file, mapping, args.date_format, args.category)
+    elif fmt_name == "ofx":
+        rows = READERS["ofx"](args.file, args.category)
+    else:
+        rows = READERS["columns"](args.file)
+    data = load_data()
+    try:
+        added, skipped = import_rows(data, rows, args.batch_size,
+                                     on_skip=lambda reason: print(f"Skipping {reason}", file=sys.stderr))
+    except ValueError as e:
+        return fail(e)
+    print(f"Imported {added} transactions ({skipped} skipped)")
+    return 0
+
+def cmd_report(args):
+    try:
+        start = parse_date(args.start) if args.start else None
+        end = parse_date(args.end) if args.end else None
+    except ValueError as e:
+        return fail(e)
+    data = load_data()
+    if start or end:
+        total_income, total_expenses, _, income_by_cat, expense_by_cat = range_summary(data, start, end)
+        by_cat = {"income": income_by_cat, "expenses": expense_by_cat}
+    elif args.month:
+        agg = get_aggregates(data)
+        month = agg.monthly.get(args.month, {"income": 0.0, "expenses": 0.0})
+        total_income, total_expenses = month["income"], month["expenses"]
+        by_cat = {
+            kind: {cat: amount for (m, cat), amount in agg.by_month_category[kind].items() if m == args.month}
+            for kind in ("income", "expenses")
+        }
+    else:
+        total_income, total_expenses = transaction_totals(data)
+        _, income_by_cat, expense_by_cat = report_summary(data)
+        by_cat = {"income": dict(income_by_cat), "expenses": dict(expense_by_cat)}
+
+    report = {
+        "period": f"{start or '...'} to {end or '...'}" if start or end else args.month or "all",
+        "income": total_income,
+        "expenses": total_expenses,
+        "net": total_income - total_expenses,
+        "by_category": by_cat,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"Finely report ({report['period']})")
+    print(f"  Total Income:   {fmt(total_income):>15}")
+    print(f"  Total Expenses: {fmt(total_expenses):>15}")
+    print(f"  Net Balance:    {fmt(report['net']):>15}")
+    for kind, title in (("income", "Income"), ("expenses", "Expenses")):
+        if by_cat[kind]:
+            print(f"\n  {title} by Category")
+            for cat, amount in sorted(by_cat[kind].items(), key=lambda item: -item[1]):
+                print(f"    {cat:<20} {fmt(amount):>15}")
+    return 0
+
+def cmd_export(args):
+    from finely.exporter import iter_transactions, write_csv, write_columns
+    fmt_name = args.format or ("columns" if args.file and args.file.lower().endswith(".fcol") else "csv")
+    try:
+        start = parse_date(args.start) if args.start else None
+        end = parse_date(args.end) if args.end else None
+    except ValueError as e:
+        return fail(e)
+    data = load_data()
+    rows = iter_transactions(data, start, end, args.category)
+    if fmt_name == "columns":
+        out = open(args.file, "wb") if args.file else sys.stdout.buffer
+        write = write_columns
+    else:
+        out = open(args.file, "w", newline="", encoding="utf-8") if args.file else sys.stdout
+        write = write_csv
+    try:
+        count = write(rows, out)
+    except BrokenPipeError:
+        # the reader of stdout (e.g. head) stopped early; that's how streams end, not an error.
+        # point stdout at devnull so the exit-time flush doesn't hit the closed pipe again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if args.file:
+            out.close()
+    if args.file:
+        print(f"Exported {count} transactions to {args.file}")
+    return 0
+
+def cmd_category(args):
+    data = load_data()
+    kind = KIND_BY_TYPE[args.type]
+    names = data["categories"][kind]
+    if args.name not in names:
+        return fail(f"unknown {args.type} category '{args.name}'")
+    if args.action == "rename":
+        merged = args.new in names
+        rename_category(data, kind, args.name, args.new)
+        print(f"{'Merged' if merged else 'Renamed'} '{args.name}' {'into' if merged else 'to'} '{args.new}'")
+    elif category_in_use(data, kind, args.name):
+        target = args.to or ("Other" if "Other" in names and args.name != "Other" else None)
+        if not target or target == args.name:
+            return fail(f"'{args.name}' still has transactions; pass --to CATEGORY")
+        delete_category(data, kind, args.name, reassign_to=target)
+        print(f"Deleted '{args.name}', its transactions moved to '{target}'")
+    else:
+        delete_category(data, kind, args.name)
+        print(f"Deleted '{args.name}'")
+    return 0
+
+def cmd_serve(args):
+    from finely.main import run_server
+    return run_server(args.host, args.port)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="finely", description="Finely personal finance tracker. Run without a command to open the app.")
+    sub = parser.add_subparsers(dest="command")
+
+    add = sub.add_parser("add", help="add one transaction")
+    add.add_argument("type", choices=["income", "expense"])
+    add.add_argument("amount")
+    add.add_argument("category")
+    add.add_argument("label", help="income source or expense description")
+    add.add_argument("--date", help="YYYY-MM-DD (default: today)")
+    add.set_defaults(func=cmd_add)
+
+    imp = sub.add_parser("import", help="import transactions from a CSV or OFX file")
+    imp.add_argument("file", help="CSV with amount and date columns (type, category and label optional), "
+                                  "an OFX/QFX statement or a .fcol export")
+    imp.add_argument("--format", choices=["csv", "ofx", "columns"], help="default: guessed from the file extension")
+    imp.add_argument("--map", action="append", default=[], metavar="FIELD=COLUMN",
+                     help="CSV column for type, amount, category, date or label (repeatable)")
+    imp.add_argument("--date-format", help="strptime format for CSV dates (default: common formats are tried)")
+    imp.add_argument("--category", default="Other", help="category for rows without one (default: Other)")
+    imp.add_argument("--batch-size", type=int, default=5000, help="transactions per commit (default: 5000)")
+    imp.set_defaults(func=cmd_import)
+
+    category = sub.add_parser("category", help="rename, merge or delete a category")
+    actions = category.add_subparsers(dest="action", required=True)
+    rename = actions.add_parser("rename", help="rename a category; an existing name merges the two")
+    rename.add_argument("type", choices=["income", "expense"])
+    rename.add_argument("name")
+    rename.add_argument("new")
+    delete = actions.add_parser("delete", help="delete a category, moving its transactions elsewhere")
+    delete.add_argument("type", choices=["income", "expense"])
+    delete.add_argument("name")
+    delete.add_argument("--to", help="category that takes over its transactions (default: Other)")
+    category.set_defaults(func=cmd_category)
+
+    report = sub.add_parser("report", help="print totals and category breakdown")
+    report.add_argument("--month", help="YYYY-MM (default: all time)")
+    report.add_argument("--from", dest="start", help="first date to include, YYYY-MM-DD")
+    report.add_argument("--to", dest="end", help="last date to include, YYYY-MM-DD")
+    report.add_argument("--json", action="store_true", help="machine-readable output")
+    report.set_defaults(func=cmd_report)
+
+    export = sub.add_parser("export", help="export transactions as CSV or compact columnar binary")
+    export.add_argument("file", nargs="?", help="output file (default: stdout)")
+    export.add_argument("--format", choices=["csv", "columns"], help="default: columns for .fcol files, otherwise csv")
+    export.add_argument("--from", dest="start", help="first date to include, YYYY-MM-DD")
+    export.add_argument("--to", dest="end", help="last date to include, YYYY-MM-DD")
+    export.add_argument("--category", action="append", help="only this category (repeatable)")
+    export.set_defaults(func=cmd_export)
+
+    serve = sub.add_parser("serve", help="serve the app to browsers, one profile per ?profile=<name>")
+    serve.add_argument("--host", help="address to listen on (default: localhost)")
+    serve.add_argument("--port", type=int, default=8550, help="default: 8550")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from finely.main import run_app
+        return run_app()
+    try:
+        return args.func(args)
+    except OSError as e:
+        return fail(e)
+
+if __name__ == "__main__":
+    sys.exit(main())
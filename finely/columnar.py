@@ -0,0 +1,159 @@
+import sys
+from array import array
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python reductions are used without it
+    np = None
+
+# --- Columnar Transactions ---
+# One compact column per field instead of one dict per transaction: float64 amounts, int32 date
+# ordinals and uint32 ids into string tables for categories and labels (which repeat a lot).
+# Indexing still returns the familiar dict, so data["income"] keeps working for the UI.
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+LABEL_KEYS = {"income": "source", "expenses": "description"}
+
+def column_bytes(values):
+    # little-endian bytes of an array, for the binary file formats
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+class StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def encode(self, value):
+        sid = self.ids.get(value)
+        if sid is None:
+            sid = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return sid
+
+class TransactionColumns:
+    def __init__(self, kind, txs=()):
+        self.kind = kind
+        self.label_key = LABEL_KEYS[kind]
+        self.amount = array("d")
+        self.day = array("i")
+        self.category = array("I")
+        self.label = array("I")
+        self.categories = StringTable()
+        self.labels = StringTable()
+        self.date_strings = {}
+        for tx in txs:
+            self.append(tx)
+
+    def append(self, tx):
+        self.amount.append(tx["amount"])
+        self.day.append(date.fromisoformat(tx["date"]).toordinal())
+        self.category.append(self.categories.encode(tx["category"]))
+        self.label.append(self.labels.encode(tx.get(self.label_key, "")))
+
+    def extend(self, txs):
+        for tx in txs:
+            self.append(tx)
+
+    def recategorize(self, old, new):
+        # rename or merge by editing the name table; no row is touched
+        table = self.categories
+        # after a merge several ids decode to the same name, so look at every entry
+        old_ids = [i for i, name in enumerate(table.values) if name == old]
+        if not old_ids:
+            return
+        for i in old_ids:
+            table.values[i] = new
+        table.ids.pop(old, None)
+        table.ids.setdefault(new, old_ids[0])
+
+    def date_string(self, ordinal):
+        text = self.date_strings.get(ordinal)
+        if text is None:
+            text = self.date_strings[ordinal] = date.fromordinal(ordinal).isoformat()
+        return text
+
+    def __len__(self):
+        return len(self.amount)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {
+            "amount": self.amount[index],
+            self.label_key: self.labels.values[self.label[index]],
+            "category": self.categories.values[self.category[index]],
+            "date": self.date_string(self.day[index]),
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def copy(self):
+        clone = TransactionColumns(self.kind)
+        clone.amount = array("d", self.amount)
+        clone.day = array("i", self.day)
+        clone.category = array("I", self.category)
+        clone.label = array("I", self.label)
+        clone.categories.ids = dict(self.categories.ids)
+        clone.categories.values = list(self.categories.values)
+        clone.labels.ids = dict(self.labels.ids)
+        clone.labels.values = list(self.labels.values)
+        return clone
+
+    # --- Sort Keys ---
+    # date ordinals sort exactly like the ISO date strings they replace
+    def sort_keys(self, field):
+        return self.day if field == "date" else self.amount
+
+    def sort_key(self, tx, field):
+        return date.fromisoformat(tx["date"]).toordinal() if field == "date" else tx["amount"]
+
+    # --- Reductions ---
+    def month_category_sums(self):
+        # (kind, "YYYY-MM", category, amount) for every month/category pair present
+        if not len(self):
+            return []
+        if np is not None:
+            sums = self.month_category_sums_numpy()
+        else:
+            sums = {}
+            month_of = {}
+            for amount, day, cat in zip(self.amount, self.day, self.category):
+                month = month_of.get(day)
+                if month is None:
+                    month = month_of[day] = self.date_string(day)[:7]
+                key = (month, cat)
+                sums[key] = sums.get(key, 0.0) + amount
+        names = self.categories.values
+        return [(self.kind, month, names[cat], amount) for (month, cat), amount in sums.items()]
+
+    def day_category_sums(self):
+        # (kind, "YYYY-MM-DD", category, amount) for every day/category pair present
+        sums = {}
+        for amount, day, cat in zip(self.amount, self.day, self.category):
+            key = (day, cat)
+            sums[key] = sums.get(key, 0.0) + amount
+        names = self.categories.values
+        return [(self.kind, self.date_string(day), names[cat], amount) for (day, cat), amount in sums.items()]
+
+    def month_category_sums_numpy(self):
+        amount = np.frombuffer(self.amount, dtype=np.float64)
+        days = np.frombuffer(self.day, dtype=np.intc)
+        cats = np.frombuffer(self.category, dtype=np.uintc).astype(np.int64)
+        # months since 1970-01, shifted to start at zero
+        months = (days - EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        first = int(months.min())
+        n_cats = len(self.categories.values)
+        keys = (months - first) * n_cats + cats
+        totals = np.bincount(keys, weights=amount)
+        present = np.flatnonzero(np.bincount(keys))
+        sums = {}
+        for key in present.tolist():
+            month = first + key // n_cats
+            sums[(f"{1970 + month // 12:04d}-{month % 12 + 1:02d}", key % n_cats)] = float(totals[key])
+        return sums
@@ -0,0 +1,138 @@
+import csv
+import json
+import struct
+import sys
+from array import array
+from datetime import date
+
+from finely import sqlite_store
+from finely.columnar import StringTable, TransactionColumns, column_bytes
+from finely.storage import load_history, sqlite_store_conn
+
+# --- Export ---
+# Transactions are streamed straight from the store to the output file, filtered on the way,
+# so an export never holds a second copy of the history. Rows are (type, tx) with the
+# CLI's "income"/"expense" type names.
+
+TYPES = {"income": "income", "expenses": "expense"}
+LABEL_KEYS = {"income": "source", "expense": "description"}
+
+def iter_transactions(data, start=None, end=None, categories=None):
+    # start/end are inclusive "YYYY-MM-DD" strings
+    conn = sqlite_store_conn(data)
+    if conn is not None:
+        yield from sqlite_store.iter_transactions(conn, start, end, categories)
+        return
+    load_history(data)
+    wanted = set(categories) if categories else None
+    for kind, tx_type in TYPES.items():
+        txs = data[kind]
+        if isinstance(txs, TransactionColumns):
+            # filter on the typed columns and only build dicts for rows that pass
+            lo = date.fromisoformat(start).toordinal() if start else None
+            hi = date.fromisoformat(end).toordinal() if end else None
+            # compare category ids, not strings; a merged category can own several ids
+            cat_ids = {i for i, name in enumerate(txs.categories.values) if name in wanted} if wanted else None
+            for row, (day, cat) in enumerate(zip(txs.day, txs.category)):
+                if (lo is None or day >= lo) and (hi is None or day <= hi) and (cat_ids is None or cat in cat_ids):
+                    yield tx_type, txs[row]
+            continue
+        for tx in txs:
+            if start and tx["date"] < start or end and tx["date"] > end:
+                continue
+            if wanted is None or tx["category"] in wanted:
+                yield tx_type, tx
+
+def write_csv(rows, file):
+    writer = csv.writer(file)
+    writer.writerow(["type", "amount", "category", "date", "label"])
+    count = 0
+    for tx_type, tx in rows:
+        writer.writerow([tx_type, tx["amount"], tx["category"], tx["date"], tx.get(LABEL_KEYS[tx_type], "")])
+        count += 1
+    return count
+
+# --- Columnar Binary Format ---
+# MAGIC, then blocks of up to BLOCK_ROWS rows of one type:
+#   <B type (0 income, 1 expense)> <I row count>
+#   amount float64[n] | date ordinal int32[n] | category id uint32[n] | label id uint32[n]
+# then a JSON trailer with the category and label string tables, then <Q trailer offset> MAGIC.
+# Columns are little-endian and load back with array.frombytes, no per-row parsing.
+
+MAGIC = b"FNLYCOL1"
+BLOCK_HEADER = struct.Struct("<BI")
+FOOTER = struct.Struct("<Q")
+BLOCK_ROWS = 65536
+COLUMNS = (("amount", "d"), ("day", "i"), ("category", "I"), ("label", "I"))
+TYPE_CODES = {"income": 0, "expense": 1}
+KIND_BY_CODE = {0: "income", 1: "expenses"}
+
+def write_columns(rows, file):
+    categories = StringTable()
+    labels = StringTable()
+    blocks = {code: {name: array(typecode) for name, typecode in COLUMNS} for code in TYPE_CODES.values()}
+    # bytes written so far; file may be a pipe, which can't tell() its position
+    written = {"bytes": 0}
+
+    def write(chunk):
+        file.write(chunk)
+        written["bytes"] += len(chunk)
+
+    def flush(code):
+        block = blocks[code]
+        if block["amount"]:
+            write(BLOCK_HEADER.pack(code, len(block["amount"])))
+            for name, typecode in COLUMNS:
+                write(column_bytes(block[name]))
+                block[name] = array(typecode)
+
+    write(MAGIC)
+    count = 0
+    for tx_type, tx in rows:
+        code = TYPE_CODES[tx_type]
+        block = blocks[code]
+        block["amount"].append(tx["amount"])
+        block["day"].append(date.fromisoformat(tx["date"]).toordinal())
+        block["category"].append(categories.encode(tx["category"]))
+        block["label"].append(labels.encode(tx.get(LABEL_KEYS[tx_type], "")))
+        count += 1
+        if len(block["amount"]) >= BLOCK_ROWS:
+            flush(code)
+    for code in blocks:
+        flush(code)
+
+    trailer_at = written["bytes"]
+    write(json.dumps({"categories": categories.values, "labels": labels.values}).encode("utf-8"))
+    write(FOOTER.pack(trailer_at) + MAGIC)
+    return count
+
+def read_columns(path):
+    # -> {"income": TransactionColumns, "expenses": TransactionColumns}
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a Finely columnar export")
+        file.seek(-(FOOTER.size + len(MAGIC)), 2)
+        footer_at = file.tell()
+        trailer_at, = FOOTER.unpack(file.read(FOOTER.size))
+        file.seek(trailer_at)
+        tables = json.loads(file.read(footer_at - trailer_at).decode("utf-8"))
+
+        result = {kind: TransactionColumns(kind) for kind in KIND_BY_CODE.values()}
+        for columns in result.values():
+            for table, values in ((columns.categories, tables["categories"]), (columns.labels, tables["labels"])):
+                table.values = list(values)
+                table.ids = {value: i for i, value in enumerate(values)}
+
+        file.seek(len(MAGIC))
+        while file.tell() < trailer_at:
+            code, n = BLOCK_HEADER.unpack(file.read(BLOCK_HEADER.size))
+            columns = result[KIND_BY_CODE[code]]
+            for name, _ in COLUMNS:
+                values = getattr(columns, name)
+                size = len(values)
+                values.frombytes(file.read(n * values.itemsize))
+                if sys.byteorder == "big":
+                    tail = values[size:]
+                    tail.byteswap()
+                    values[size:] = tail
+    return result
@@ -0,0 +1,109 @@
+import flet as ft
+
+# --- Native Charts ---
+# Flet vector charts built straight from the aggregates: no matplotlib, no PNG, no base64 in
+# the page. Text and grid lines use theme roles instead of palette colors, so the same
+# control renders correctly in light and dark mode and a theme switch never rebuilds it.
+
+INCOME_COLORS = ["#66B2FF", "#99FF99", "#FFD700", "#FF9999", "#C2C2F0"]
+EXPENSE_COLORS = ["#FF9999", "#FFCC99", "#FF99CC", "#FF6666", "#C2C2F0", "#FFB3E6", "#D93025"]
+INCOME_COLOR = "#00A86B"
+EXPENSE_COLOR = "#D93025"
+NET_COLOR = "#0078D7"
+WIDTH = 600
+HEIGHT = 300
+
+def axis_text(text):
+    return ft.Text(text, size=9, color=ft.Colors.ON_SURFACE)
+
+def month_label(month):
+    return f"{month[5:]}/{month[:4][2:]}"
+
+def grid_lines():
+    return ft.ChartGridLines(color=ft.Colors.OUTLINE_VARIANT, width=1, dash_pattern=[3, 3])
+
+def pie(category_data, palette):
+    total = sum(category_data.values()) or 1
+    sections = [
+        ft.PieChartSection(
+            amount,
+            title=f"{label}\n{amount / total:.1%}",
+            title_style=ft.TextStyle(size=10, weight=ft.FontWeight.BOLD, color="#2C2C2C"),
+            color=palette[i % len(palette)],
+            radius=110,
+        )
+        for i, (label, amount) in enumerate(category_data.items())
+    ]
+    return ft.PieChart(sections=sections, sections_space=1, center_space_radius=0, width=WIDTH, height=HEIGHT)
+
+def income_pie(income_data):
+    return pie(income_data, INCOME_COLORS)
+
+def expense_pie(expense_data):
+    return pie(expense_data, EXPENSE_COLORS)
+
+def month_axis(months):
+    return ft.ChartAxis(
+        labels=[ft.ChartAxisLabel(value=i, label=axis_text(month_label(m))) for i, m in enumerate(months)],
+        labels_size=24,
+    )
+
+def monthly_bar(monthly_data):
+    months = sorted(monthly_data)
+    groups = [
+        ft.BarChartGroup(
+            x=i,
+            bar_rods=[
+                ft.BarChartRod(from_y=0, to_y=monthly_data[m]["income"], width=10, color=INCOME_COLOR,
+                               tooltip=f"Income {monthly_data[m]['income']:,.0f}", border_radius=2),
+                ft.BarChartRod(from_y=0, to_y=monthly_data[m]["expenses"], width=10, color=EXPENSE_COLOR,
+                               tooltip=f"Expenses {monthly_data[m]['expenses']:,.0f}", border_radius=2),
+            ],
+            bars_space=2,
+        )
+        for i, m in enumerate(months)
+    ]
+    top = max((max(v["income"], v["expenses"]) for v in monthly_data.values()), default=0)
+    return ft.BarChart(
+        bar_groups=groups,
+        bottom_axis=month_axis(months),
+        left_axis=ft.ChartAxis(labels_size=48),
+        horizontal_grid_lines=grid_lines(),
+        max_y=top * 1.1 or 1,
+        interactive=True,
+        width=WIDTH,
+        height=HEIGHT,
+    )
+
+def net_balance_line(monthly_data):
+    months = sorted(monthly_data)
+    balances = [monthly_data[m]["income"] - monthly_data[m]["expenses"] for m in months]
+    low, high = min(balances + [0]), max(balances + [0])
+    pad = (high - low) * 0.1 or 1
+    return ft.LineChart(
+        data_series=[
+            ft.LineChartData(
+                data_points=[
+                    ft.LineChartDataPoint(i, bal, tooltip=f"{bal:,.0f}") for i, bal in enumerate(balances)
+                ],
+                stroke_width=2.5,
+                color=NET_COLOR,
+                point=True,
+            ),
+            # zero line
+            ft.LineChartData(
+                data_points=[ft.LineChartDataPoint(0, 0), ft.LineChartDataPoint(max(len(months) - 1, 1), 0)],
+                stroke_width=1,
+                color=ft.Colors.OUTLINE,
+                dash_pattern=[4, 4],
+            ),
+        ],
+        bottom_axis=month_axis(months),
+        left_axis=ft.ChartAxis(labels_size=48),
+        horizontal_grid_lines=grid_lines(),
+        min_y=low - pad,
+        max_y=high + pad,
+        interactive=True,
+        width=WIDTH,
+        height=HEIGHT,
+    )
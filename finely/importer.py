@@ -0,0 +1,156 @@
+import csv
+import re
+from datetime import datetime
+
+from finely.exporter import read_columns
+from finely.storage import STORAGE_MODE, commit_batch, save_data
+
+# --- Bulk Import ---
+# Bank exports are read row by row and committed in batches, so a million-line file never sits
+# in memory as dicts and never costs a save per row. Readers yield (kind, tx) for good rows and
+# (None, reason) for rows they had to skip.
+
+LABEL_KEYS = {"income": "source", "expenses": "description"}
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y", "%d.%m.%Y", "%Y%m%d")
+BATCH_SIZE = 5000
+
+# field -> header names we recognise (lowercased)
+CSV_COLUMNS = {
+    "type": ("type", "kind"),
+    "amount": ("amount", "amt", "value"),
+    "category": ("category",),
+    "date": ("date", "posted", "transaction date", "booking date"),
+    "label": ("label", "source", "description", "payee", "name", "memo"),
+}
+TYPE_KINDS = {"income": "income", "expense": "expenses", "expenses": "expenses"}
+
+def parse_date(value, date_format=None):
+    value = value.strip()
+    for fmt in (date_format,) if date_format else DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date '{value}'")
+
+def make_tx(kind, amount, category, label, date):
+    return {"amount": amount, LABEL_KEYS[kind]: label, "category": category, "date": date}
+
+def map_columns(header, mapping=None):
+    # field -> column name; explicit mapping wins over auto-detection
+    columns = {}
+    lowered = {name.strip().lower(): name for name in header if name}
+    for field, names in CSV_COLUMNS.items():
+        for name in names:
+            if name in lowered:
+                columns[field] = lowered[name]
+                break
+    columns.update(mapping or {})
+    missing = [field for field in ("amount", "date") if field not in columns]
+    if missing:
+        raise ValueError(f"no column for {', '.join(missing)} (use --map field=column)")
+    return columns
+
+def read_csv(path, mapping=None, date_format=None, default_category="Other"):
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        columns = map_columns(reader.fieldnames or [], mapping)
+        for line, row in enumerate(reader, start=2):
+            try:
+                amount = float(row[columns["amount"]].replace(",", ""))
+                if "type" in columns:
+                    kind = TYPE_KINDS[row[columns["type"]].strip().lower()]
+                else:
+                    # signed amounts: credits are income, debits are expenses
+                    kind = "income" if amount >= 0 else "expenses"
+                amount = abs(amount)
+                label = (row.get(columns.get("label")) or "").strip()
+                category = (row.get(columns.get("category")) or "").strip() or default_category
+                date = parse_date(row[columns["date"]], date_format)
+            except (KeyError, ValueError, AttributeError) as e:
+                yield None, f"line {line}: {e}"
+                continue
+            if not label or amount <= 0:
+                yield None, f"line {line}: Invalid input"
+                continue
+            yield kind, make_tx(kind, amount, category, label, date)
+
+# OFX 1.x is SGML (leaf tags are often never closed) and 2.x is XML; a tag tokenizer over
+# fixed-size chunks handles both without building a tree.
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+OFX_CHUNK = 1 << 16
+
+def ofx_tokens(file):
+    buffer = ""
+    while True:
+        chunk = file.read(OFX_CHUNK)
+        buffer += chunk
+        # hold back from the last "<" so a tag split across chunks is read whole
+        cut = buffer.rfind("<") if chunk else len(buffer)
+        if cut > 0:
+            for match in OFX_TAG.finditer(buffer, 0, cut):
+                yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+            buffer = buffer[cut:]
+        if not chunk:
+            return
+
+def read_ofx(path, default_category="Other"):
+    with open(path, encoding="utf-8", errors="replace") as file:
+        fields = None
+        count = 0
+        for closing, tag, value in ofx_tokens(file):
+            if tag == "STMTTRN":
+                if not closing:
+                    fields = {}
+                    continue
+                if fields is None:
+                    continue
+                count += 1
+                try:
+                    amount = float(fields["TRNAMT"].replace(",", "."))
+                    kind = "income" if amount >= 0 else "expenses"
+                    date = parse_date(fields["DTPOSTED"][:8], "%Y%m%d")
+                except (KeyError, ValueError) as e:
+                    yield None, f"transaction {count}: {e}"
+                else:
+                    label = fields.get("NAME") or fields.get("MEMO") or fields.get("PAYEE", "")
+                    if not label or amount == 0:
+                        yield None, f"transaction {count}: Invalid input"
+                    else:
+                        yield kind, make_tx(kind, abs(amount), default_category, label, date)
+                fields = None
+            elif fields is not None and not closing and value:
+                fields[tag] = value
+
+def read_fcol(path):
+    # exports are already validated; just hand the rows back
+    for kind, columns in read_columns(path).items():
+        for tx in columns:
+            yield kind, tx
+
+READERS = {"csv": read_csv, "ofx": read_ofx, "columns": read_fcol}
+
+def import_rows(data, rows, batch_size=BATCH_SIZE, on_skip=None):
+    added = skipped = 0
+    known = {kind: set(data["categories"][kind]) for kind in LABEL_KEYS}
+    batch = []
+    for kind, tx in rows:
+        if kind is None:
+            skipped += 1
+            if on_skip:
+                on_skip(tx)
+            continue
+        if tx["category"] not in known[kind]:
+            known[kind].add(tx["category"])
+            batch.append({"op": "add_cat", "kind": kind, "name": tx["category"]})
+        batch.append({"op": "add", "kind": kind, "tx": tx})
+        added += 1
+        if len(batch) >= batch_size:
+            commit_batch(data, batch)
+            batch = []
+    if batch:
+        commit_batch(data, batch)
+    if STORAGE_MODE in ("json", "binary", "shards") and added:
+        # one write for the whole file (or every touched month)
+        save_data(data)
+    return added, skipped
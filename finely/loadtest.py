@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+# --- Load Test ---
+# python -m finely.loadtest [--sessions 20] [--profiles 2] [--ops 200] [--size 10k]
+# Simulates server mode headlessly: every session is a thread working on the shared Store of
+# its profile, mostly browsing (list pages, search, other sorts, totals, a report range) and
+# now and then adding a transaction. Reports latency percentiles per operation, then checks
+# that every add reached memory, the aggregates and the profile's data.json.
+
+PAGE_SIZE = 50
+QUERIES = ["market", "cafe", "pizza", "gym", "ca", "payroll", "bill"]
+SORTS = ["amount_high", "amount_low", "oldest"]
+# operation -> share of a session's work; "add" is the only write
+MIX = {"list": 0.3, "search": 0.2, "sort": 0.1, "totals": 0.2, "report": 0.1, "add": 0.1}
+
+def percentile(values, share):
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+def run_session(store, ops, seed, start_gate, latencies, added):
+    from finely.bench import END_DATE, EXPENSE_LABELS
+    rng = random.Random(seed)
+    names = list(MIX)
+    weights = list(MIX.values())
+    categories = list(store.data["categories"]["expenses"])
+
+    def add():
+        tx = {
+            "amount": round(rng.uniform(1, 200), 2),
+            "description": rng.choice(EXPENSE_LABELS),
+            "category": rng.choice(categories),
+            "date": (END_DATE - timedelta(days=rng.randrange(60))).isoformat(),
+        }
+        store.add_transaction("expenses", tx)
+        added.append(tx)
+
+    actions = {
+        "list": lambda: store.find_transactions("all", "", "newest")[:PAGE_SIZE],
+        "search": lambda: store.find_transactions("all", rng.choice(QUERIES), "newest")[:PAGE_SIZE],
+        "sort": lambda: store.find_transactions("expense", "", rng.choice(SORTS))[:PAGE_SIZE],
+        "totals": store.transaction_totals,
+        "report": lambda: store.range_summary((END_DATE - timedelta(days=29)).isoformat(), END_DATE.isoformat()),
+        "add": add,
+    }
+    start_gate.wait()
+    for name in rng.choices(names, weights, k=ops):
+        start = time.perf_counter()
+        actions[name]()
+        latencies.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+def check_profile(store, expected):
+    # every add is in memory, in the aggregates and, after the flush, on disk
+    from finely.aggregates import Aggregates
+    from finely.storage import read_data_file
+    counts = {kind: len(store.data[kind]) for kind in ("income", "expenses")}
+    fresh = Aggregates.from_data(store.data).totals
+    cached = store.get_aggregates().totals
+    on_disk = read_data_file(store.path) or {}
+    disk_counts = {kind: len(on_disk.get(kind, [])) for kind in ("income", "expenses")}
+    return {
+        "transactions": sum(counts.values()),
+        "expected": expected,
+        "on_disk": sum(disk_counts.values()),
+        "ok": (sum(counts.values()) == expected and disk_counts == counts
+               and all(abs(fresh[kind] - cached[kind]) < 1e-6 * max(1.0, fresh[kind]) for kind in fresh)),
+    }
+
+def parse_size(value):
+    from finely.bench import SIZES
+    return SIZES[value.lower()] if value.lower() in SIZES else int(value)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m finely.loadtest", description="Simulate concurrent server sessions against shared profile stores.")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent sessions (default: 20)")
+    parser.add_argument("--profiles", type=int, default=2, help="profiles the sessions are spread over (default: 2)")
+    parser.add_argument("--ops", type=int, default=200, help="operations per session (default: 200)")
+    parser.add_argument("--size", default="10000", help="transactions per profile before the run, a count or 1k/100k/1m (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results here instead of stdout")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        size = parse_size(args.size)
+    except ValueError:
+        print(f"Error: unknown size '{args.size}'", file=sys.stderr)
+        return 1
+    if args.sessions < 1 or args.profiles < 1:
+        print("Error: --sessions and --profiles must be at least 1", file=sys.stderr)
+        return 1
+    if "finely.storage" in sys.modules:
+        print("Error: run the load test in a fresh interpreter (python -m finely.loadtest)", file=sys.stderr)
+        return 1
+
+    def log(message):
+        print(message, file=sys.stderr, flush=True)
+
+    scratch = tempfile.mkdtemp(prefix="finely-load-")
+    # storage reads its data dir at import, so point it at the scratch dir first
+    os.environ["FINELY_DATA_DIR"] = scratch
+    try:
+        from finely.bench import generate_dataset
+        from finely.storage import COLUMNAR
+        from finely.store import PROFILE_DIR, get_store, flush_stores
+        profiles = [f"load{i}" for i in range(args.profiles)]
+        for name in profiles:
+            os.makedirs(os.path.join(PROFILE_DIR, name))
+            generate_dataset(os.path.join(PROFILE_DIR, name, "data.json"), size, args.seed)
+        log(f"{args.sessions} sessions x {args.ops} ops on {args.profiles} profile(s) of {size:,} transactions"
+            f"{' (columnar)' if COLUMNAR else ''}")
+
+        latencies = [{} for _ in range(args.sessions)]
+        added = {name: [] for name in profiles}
+        start_gate = threading.Barrier(args.sessions + 1)
+        # sessions open their profile themselves, like browser tabs arriving at once
+        threads = [
+            threading.Thread(target=lambda i=i: run_session(
+                get_store(profiles[i % len(profiles)]), args.ops, args.seed + i,
+                start_gate, latencies[i], added[profiles[i % len(profiles)]]
+            ), name=f"session-{i}")
+            for i in range(args.sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        start_gate.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        flush_stores()
+
+        ops = {}
+        for session in latencies:
+            for name, values in session.items():
+                ops.setdefault(name, []).extend(values)
+        summary = {}
+        for name, values in sorted(ops.items()):
+            values.sort()
+            summary[name] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 0.5), 3),
+                "p95_ms": round(percentile(values, 0.95), 3),
+                "max_ms": round(values[-1], 3),
+            }
+            log(f"  {name}: p50 {summary[name]['p50_ms']:.2f} ms, p95 {summary[name]['p95_ms']:.2f} ms")
+        checks = {name: check_profile(get_store(name), size + len(added[name])) for name in profiles}
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    total_ops = sum(entry["count"] for entry in summary.values())
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "columnar": COLUMNAR,
+        "sessions": args.sessions,
+        "profiles": args.profiles,
+        "size": size,
+        "elapsed_s": round(elapsed, 3),
+        "ops_per_s": round(total_ops / elapsed, 1) if elapsed else None,
+        "ops": summary,
+        "checks": checks,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0 if all(check["ok"] for check in checks.values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
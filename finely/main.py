@@ -1,17 +1,21 @@
+import time
+STARTED_AT = time.perf_counter()
+
 import flet as ft
+import asyncio
 import json
 import os
 from datetime import datetime
-from collections import defaultdict
-import matplotlib.pyplot as plt
-import matplotlib
-from io import BytesIO
 import base64
-import platform
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import toml
-
-# --- تنظیم Matplotlib ---
-matplotlib.use("Agg")
+from finely import charts, flet_charts, perf
+from finely.storage import DATA_FILE, load_data, flush_saves
+from finely.store import DEFAULT_PROFILE, desktop_store, get_store, flush_stores
+from finely.timeline import PERIODS, period_bounds
 
 # --- Color Palette Generator ---
 def get_colors(theme="light"):
@@ -46,97 +50,40 @@ def get_colors(theme="light"):
             "shadow": "#333333",
         }
 
-# --- تنظیم رنگ‌های Matplotlib بر اساس تم ---
-def update_matplotlib_colors(theme="light"):
-    c = get_colors(theme)
-    plt.rcParams.update({
-        'font.family': 'Vazirmatn',
-        'font.sans-serif': ['Vazirmatn', 'Arial', 'Calibri', 'Helvetica'],
-        'axes.titleweight': 'bold',
-        'axes.titlesize': 13,
-        'axes.labelsize': 10,
-        'axes.labelweight': 'bold',
-        'axes.edgecolor': '#555555' if theme == "dark" else '#333333',
-        'axes.linewidth': 0.8,
-        'axes.facecolor': c["card"],
-        'figure.facecolor': c["card"],
-        'grid.color': c["border"],
-        'grid.linestyle': '--',
-        'grid.alpha': 0.4,
-        'xtick.labelsize': 9,
-        'ytick.labelsize': 9,
-        'text.color': c["text"],
-        'axes.labelcolor': c["text"],
-        'xtick.color': c["text"],
-        'ytick.color': c["text"],
-        'savefig.transparent': False,
-        'savefig.pad_inches': 0.3,
-        'savefig.dpi': 120,
-        'lines.linewidth': 2.5
-    })
-
-# --- Data File ---
-def get_data_dir():
-    if platform.system() == "Windows":
-        return os.path.join(os.getenv("APPDATA"), "Finely")
-    elif platform.system() == "Darwin":
-        return os.path.expanduser("~/Library/Application Support/Finely")
-    else:  # Linux
-        return os.path.expanduser("~/.local/share/Finely")
-
-DATA_DIR = get_data_dir()
-os.makedirs(DATA_DIR, exist_ok=True)
-
-DATA_FILE = os.path.join(DATA_DIR, "data.json")
-default_data = {
-    "income": [],
-    "expenses": [],
-    "categories": {
-        "income": ["Salary", "Freelance", "Investments", "Gifts", "Other"],
-        "expenses": ["Food", "Transport", "Utilities", "Entertainment", "Shopping", "Health", "Other"]
-    },
-    "theme": "light"
-}
-
-# --- JSON Functions ---
-def load_data():
-    if not os.path.exists(DATA_FILE):
-        return default_data
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            for key in default_data:
-                if key == "categories":
-                    for cat_type in default_data["categories"]:
-                        if cat_type not in data["categories"]:
-                            data["categories"][cat_type] = default_data["categories"][cat_type]
-                else:
-                    if key not in data:
-                        data[key] = default_data[key]
-            return data
-    except Exception as e:
-        print(f"Error loading data: {e}")
-        return default_data
-
-def save_data(data_to_save):
-    try:
-        with open(DATA_FILE, "w", encoding="utf-8") as file:
-            json.dump(data_to_save, file, indent=4)
-    except Exception as e:
-        print(f"Save error: {e}")
-
-data = load_data()
-save_data(data)
+# --- Startup ---
+# data.json is parsed on a background thread while the Flet window starts up
+data_loader = None
+# first dashboard paint, measured from importing this module; FINELY_STARTUP_TIMING=1 prints it
+STARTUP_TARGET_MS = 1500
+
+def start_loading_data():
+    global data_loader
+    if data_loader is None:
+        data_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="finely-load").submit(load_data)
+    return data_loader
+
+def report_startup():
+    elapsed = (time.perf_counter() - STARTED_AT) * 1000
+    if os.getenv("FINELY_STARTUP_TIMING") == "1":
+        status = "ok" if elapsed <= STARTUP_TARGET_MS else "over target"
+        print(f"Startup: {elapsed:.0f} ms (target {STARTUP_TARGET_MS} ms, {status})")
+
+# transaction cards materialized per scroll step in the dashboard list
+TX_PAGE_SIZE = 50
+# seconds of quiet in the search box before the query runs
+SEARCH_DEBOUNCE = 0.25
+# seconds after the first dashboard paint before Reports is prepared in the background
+WARMUP_DELAY = 1.0
 
 # --- Reusable StatCard ---
-def StatCard(title, value, color, icon):
+def StatCard(colors, title, value, color, icon, value_ref=None):
     return ft.Container(
         content=ft.Column([
             ft.Row([
                 ft.Icon(icon, color=color, size=20),
                 ft.Text(title, size=12, color=colors["text_light"], font_family="Vazirmatn")
             ], spacing=6),
-            ft.Text(value, size=20, color=colors["text"], weight="bold", font_family="Vazirmatn Bold"),
+            ft.Text(value, ref=value_ref, size=20, color=colors["text"], weight="bold", font_family="Vazirmatn Bold"),
         ], spacing=4),
         padding=16,
         border=ft.border.all(1, colors["border"]),
@@ -146,23 +93,88 @@ def StatCard(title, value, color, icon):
         height=100
     )
 
-chart_cache = {
-    "last_hash": None,
-    "income_pie": None,
-    "expense_pie": None,
-    "monthly_bar": None,
-    "net_balance_line": None
-}
-
-def get_data_hash():
-    return hash(json.dumps(data, sort_keys=True))
-
-def plot_to_image():
-    buf = BytesIO()
-    plt.savefig(buf, format="png", dpi=100, bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    img_base64 = base64.b64encode(buf.read()).decode("utf-8")
+# --- Performance Panel ---
+# seconds between refreshes of the on-screen timing table
+PERF_REFRESH = 1.0
+
+def create_perf_panel(refresh):
+    # -> (panel, refreshing); refreshing(on) starts or stops the thread that keeps it current,
+    # which only runs while the panel is shown on a connected page
+    text = ft.Text("", size=11, font_family="monospace", color="#E0E0E0")
+    panel = ft.Container(
+        content=text,
+        right=12,
+        bottom=12,
+        padding=10,
+        border_radius=8,
+        bgcolor="#CC000000",
+        visible=perf.enabled
+    )
+    # the running thread's stop Event, None while stopped
+    state = {"stop": None}
+
+    def loop(stop):
+        while not stop.wait(PERF_REFRESH):
+            if not perf.enabled:
+                # switched off from another session
+                continue
+            lines = [f"{'':<16}{'calls':>6}{'avg ms':>9}{'max ms':>9}"]
+            lines += [f"{name[:16]:<16}{calls:>6}{avg:>9.1f}{peak:>9.1f}"
+                      for name, calls, _, avg, peak, _ in perf.summary(8)]
+            text.value = "\n".join(lines)
+            try:
+                refresh(panel)
+            except Exception:
+                # the window is gone
+                if state["stop"] is stop:
+                    state["stop"] = None
+                return
+
+    def refreshing(on):
+        if on and state["stop"] is None:
+            state["stop"] = threading.Event()
+            threading.Thread(target=loop, args=(state["stop"],), daemon=True, name="finely-perf").start()
+        elif not on and state["stop"] is not None:
+            state["stop"].set()
+            state["stop"] = None
+
+    refreshing(panel.visible)
+    return panel, refreshing
+
+# --- Chart Cache ---
+# Each session keeps chart name -> (key, control) in session["charts"], key = aggregate
+# version the chart depends on + chart style. Controls belong to one page, so what sessions
+# on the same profile share is the rendered PNGs: Store.charts in memory and the disk cache.
+# Each session is {"store": Store, "theme": theme, "colors": its palette, "charts": {}}, see
+# main(). The theme is the session's, fixed when it started like its palette: the profile's
+# setting may have changed since, and a PNG must be keyed by the colors it was drawn with.
+
+def chart_cache_dir(store):
+    # rendered PNGs keyed by a digest of the chart's inputs, so they survive restarts
+    return os.path.join(store.dir, "charts")
+
+def get_data_version(store, kind=None):
+    return store.data_version(kind)
+
+# charts render in worker processes; the view shows placeholders and swaps images in
+chart_pool = None
+
+def get_chart_pool():
+    global chart_pool
+    if chart_pool is None:
+        try:
+            chart_pool = ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        except (OSError, NotImplementedError) as e:
+            print(f"Chart pool error, rendering on a thread: {e}")
+            chart_pool = ThreadPoolExecutor(max_workers=1)
+    return chart_pool
+
+@perf.timed("plot_to_image")
+def plot_to_image(png):
+    img_base64 = base64.b64encode(png).decode("utf-8")
     return ft.Image(
         src_base64=img_base64,
         width=600,
@@ -170,91 +182,109 @@ def plot_to_image():
         fit=ft.ImageFit.CONTAIN
     )
 
-def create_income_pie(income_data):
+def chart_cache_path(session, name, chart_data):
+    payload = json.dumps([name, session["theme"], chart_data], sort_keys=True)
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(chart_cache_dir(session["store"]), f"{name}-{digest}.png")
+
+def cached_chart(session, name, chart_data, render):
+    store, colors = session["store"], session["colors"]
+    path = chart_cache_path(session, name, chart_data)
+    # name -> (path, png): only the latest render of each chart is kept in memory
+    shared = store.charts.get(name)
+    if shared and shared[0] == path:
+        return plot_to_image(shared[1])
+    try:
+        with open(path, "rb") as file:
+            png = file.read()
+        store.charts[name] = (path, png)
+        return plot_to_image(png)
+    except OSError:
+        pass
+
+    holder = ft.Container(
+        content=ft.ProgressRing(width=32, height=32, color=colors["primary"]),
+        alignment=ft.alignment.center,
+        width=600,
+        height=300
+    )
+    # plain dicts only: defaultdict factories can't be pickled to the workers
+    chart_data = json.loads(json.dumps(chart_data))
+    future = get_chart_pool().submit(render, chart_data, session["theme"], dict(colors))
+    # renders that haven't started yet are cancelled when the user navigates away
+    session["renders"].add(future)
+    future.add_done_callback(lambda f: finish_chart(session, holder, name, path, f))
+    return holder
+
+def finish_chart(session, holder, name, path, future):
+    store = session["store"]
+    session["renders"].discard(future)
+    if future.cancelled():
+        # forget the placeholder so the next visit renders the chart again
+        cached = session["charts"].get(name)
+        if cached and cached[1] is holder:
+            del session["charts"][name]
+        return
+    try:
+        png = future.result()
+    except Exception as e:
+        print(f"Chart render error ({name}): {e}")
+        holder.content = ft.Text("Chart could not be rendered.", italic=True, color=session["colors"]["text_light"])
+    else:
+        store.charts[name] = (path, png)
+        cache_dir = chart_cache_dir(store)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for old in os.listdir(cache_dir):
+                if old.startswith(f"{name}-") and os.path.join(cache_dir, old) != path:
+                    os.remove(os.path.join(cache_dir, old))
+            with open(path, "wb") as file:
+                file.write(png)
+        except OSError as e:
+            print(f"Chart cache error: {e}")
+        holder.content = plot_to_image(png)
+    try:
+        holder.update()
+    except AssertionError:
+        # the user left Reports before this chart finished; it shows up on the next visit
+        pass
+
+def chart_style(session):
+    # native charts follow the theme by themselves; PNGs bake its colors in
+    return "native" if session["store"].data["chart_mode"] == "native" else session["theme"]
+
+def chart_control(session, name, chart_data, render, build):
+    if session["store"].data["chart_mode"] == "native":
+        return build(chart_data)
+    return cached_chart(session, name, chart_data, render)
+
+def create_income_pie(session, income_data):
     if not income_data:
-        return ft.Text("No income data.", italic=True, color=colors["text_light"])
-    update_matplotlib_colors(data["theme"])
-    labels = list(income_data.keys())
-    sizes = list(income_data.values())
-    plt.figure(figsize=(5, 4))
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
-            colors=["#66B2FF", "#99FF99", "#FFD700", "#FF9999", "#C2C2F0"][:len(labels)])
-    plt.title("Income Distribution by Category", fontsize=12, fontweight='bold', pad=20)
-    return plot_to_image()
-
-def create_expense_pie(expense_data):
+        return ft.Text("No income data.", italic=True, color=session["colors"]["text_light"])
+    return chart_control(session, "income_pie", income_data, charts.render_income_pie, flet_charts.income_pie)
+
+def create_expense_pie(session, expense_data):
     if not expense_data:
-        return ft.Text("No expense data.", italic=True, color=colors["text_light"])
-    update_matplotlib_colors(data["theme"])
-    labels = list(expense_data.keys())
-    sizes = list(expense_data.values())
-    plt.figure(figsize=(5, 4))
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90,
-            colors=["#FF9999", "#FFCC99", "#FF99CC", "#FF6666", "#C2C2F0", "#FFB3E6", "#D93025"][:len(labels)])
-    plt.title("Expense Distribution by Category", fontsize=12, fontweight='bold', pad=20)
-    return plot_to_image()
-
-def create_monthly_bar(monthly_data):
+        return ft.Text("No expense data.", italic=True, color=session["colors"]["text_light"])
+    return chart_control(session, "expense_pie", expense_data, charts.render_expense_pie, flet_charts.expense_pie)
+
+def create_monthly_bar(session, monthly_data):
     if not monthly_data:
-        return ft.Text("No monthly data.", italic=True, color=colors["text_light"])
-    update_matplotlib_colors(data["theme"])
-    months = sorted(monthly_data.keys())
-    month_labels = [f"{m[5:]}/{m[:4][2:]}" for m in months]
-    incomes = [monthly_data[m]["income"] for m in months]
-    expenses = [monthly_data[m]["expenses"] for m in months]
-
-    x = range(len(months))
-    width = 0.35
-
-    plt.figure(figsize=(7, 4))
-    plt.bar([i - width/2 for i in x], incomes, width, label="Income", color=colors["accent"], alpha=0.8)
-    plt.bar([i + width/2 for i in x], expenses, width, label="Expenses", color=colors["danger"], alpha=0.8)
-    plt.xlabel("Month (MM/YY)", fontsize=10)
-    plt.ylabel("Amount", fontsize=10)
-    plt.title("Monthly Income vs Expenses", fontsize=12, fontweight='bold', pad=15)
-    plt.xticks(x, month_labels, rotation=0, fontsize=9)
-    plt.yticks(fontsize=9)
-    plt.legend(fontsize=10)
-    plt.grid(axis='y', linestyle='--', alpha=0.4)
-    plt.tight_layout(pad=2.0)
-    return plot_to_image()
-
-def create_net_balance_line(monthly_data):
+        return ft.Text("No monthly data.", italic=True, color=session["colors"]["text_light"])
+    return chart_control(session, "monthly_bar", monthly_data, charts.render_monthly_bar, flet_charts.monthly_bar)
+
+def create_net_balance_line(session, monthly_data):
     if not monthly_data:
-        return ft.Text("No data for balance trend.", italic=True, color=colors["text_light"])
-    update_matplotlib_colors(data["theme"])
-    months = sorted(monthly_data.keys())
-    month_labels = [f"{m[5:]}/{m[:4][2:]}" for m in months]
-    balances = [monthly_data[m]["income"] - monthly_data[m]["expenses"] for m in months]
-
-    plt.figure(figsize=(7, 4))
-    plt.plot(month_labels, balances, marker='o', linewidth=2.5, color=colors["primary"], label="Net Balance")
-
-    for i, bal in enumerate(balances):
-        color = colors["accent"] if bal >= 0 else colors["danger"]
-        plt.plot(i, bal, 'o', color=color)
-        plt.text(i, bal + (10 if bal >= 0 else -15), f"{bal:,.0f}", fontsize=8, ha='center', va='center')
-
-    plt.axhline(0, color=colors["text_light"], linewidth=1, linestyle='--')
-    plt.xlabel("Month (MM/YY)", fontsize=10)
-    plt.ylabel("Net Balance", fontsize=10)
-    plt.title("Monthly Net Balance Trend", fontsize=12, fontweight='bold', pad=15)
-    plt.xticks(rotation=0, fontsize=9)
-    plt.yticks(fontsize=9)
-    plt.grid(axis='y', linestyle='--', alpha=0.5)
-    plt.tight_layout(pad=2.0)
-    return plot_to_image()
+        return ft.Text("No data for balance trend.", italic=True, color=session["colors"]["text_light"])
+    return chart_control(session, "net_balance_line", monthly_data, charts.render_net_balance_line, flet_charts.net_balance_line)
 
 
 # --- Main App ---
-def main(page: ft.Page):
-    global data, colors
-    colors = get_colors(data["theme"])
+async def main(page: ft.Page, store=None):
+    # store: the profile this session works on (server mode); the desktop data by default
 
     page.title = "Finely"
     page.window_icon = "assets/icon/icon-tra.png"
-    page.theme_mode = ft.ThemeMode.DARK if data["theme"] == "dark" else ft.ThemeMode.LIGHT
-    page.bgcolor = colors["background"]
     page.fonts = {
         "Vazirmatn": "fonts/Vazirmatn-Medium.ttf",
         "Vazirmatn Bold": "fonts/Vazirmatn-Bold.ttf",
@@ -264,6 +294,29 @@ def main(page: ft.Page):
     page.window_min_width = 1000
     page.window_min_height = 700
 
+    # paint the window right away, then wait for the data that has been loading meanwhile
+    loading = ft.Container(ft.ProgressRing(), alignment=ft.alignment.center, expand=True)
+    page.add(loading)
+    store = store or desktop_store(await asyncio.wrap_future(start_loading_data()))
+    data = store.data
+    theme = data["theme"]
+    colors = get_colors(theme)
+    session = {"store": store, "theme": theme, "colors": colors, "charts": {}, "renders": set()}
+    page.theme_mode = ft.ThemeMode.DARK if theme == "dark" else ft.ThemeMode.LIGHT
+    page.bgcolor = colors["background"]
+    page.controls.remove(loading)
+
+    # count every page.update(); the panel refreshes through the unwrapped one so it stays out of its own numbers
+    perf.enable(perf.enabled or data["perf"])
+    page_update = page.update
+    page.update = perf.wrap("page.update", page_update)
+    perf_panel, perf_refreshing = create_perf_panel(page_update)
+    page.overlay.append(perf_panel)
+    # a closed tab (server mode) must not keep a thread refreshing its dead page
+    page.on_disconnect = lambda _: perf_refreshing(False)
+    page.on_close = lambda _: perf_refreshing(False)
+    page.on_connect = lambda _: perf_refreshing(perf_panel.visible)
+
     # --- Utility Functions ---
     def create_text_field(label, color, width=300):
         return ft.TextField(
@@ -350,19 +403,24 @@ def main(page: ft.Page):
     )
 
     # --- DASHBOARD ---
-    def show_dashboard():
-        total_income = sum(item["amount"] for item in data["income"])
-        total_expenses = sum(item["amount"] for item in data["expenses"])
+    @perf.timed("show_dashboard")
+    async def show_dashboard():
+        total_income, total_expenses = await asyncio.to_thread(store.transaction_totals)
         net_balance = total_income - total_expenses
 
         def fmt(n):
             return f"{n:,.2f}"
 
+        # kept so an add can rewrite just these three values
+        income_value = ft.Ref[ft.Text]()
+        expenses_value = ft.Ref[ft.Text]()
+        net_value = ft.Ref[ft.Text]()
+
         stats_row = ft.Row(
             controls=[
-                StatCard("Total Income", fmt(total_income), colors["accent"], "paid"),
-                StatCard("Total Expenses", fmt(total_expenses), colors["danger"], "payments"),
-                StatCard("Net Balance", fmt(net_balance), colors["primary"], "account_balance_wallet"),
+                StatCard(colors, "Total Income", fmt(total_income), colors["accent"], "paid", income_value),
+                StatCard(colors, "Total Expenses", fmt(total_expenses), colors["danger"], "payments", expenses_value),
+                StatCard(colors, "Net Balance", fmt(net_balance), colors["primary"], "account_balance_wallet", net_value),
             ],
             spacing=20,
             alignment=ft.MainAxisAlignment.CENTER,
@@ -373,23 +431,23 @@ def main(page: ft.Page):
         source_inc = create_text_field("Source", colors["accent"], width=145)
         cat_inc = create_dropdown("Category", data["categories"]["income"], colors["accent"])
 
-        def add_income(e):
+        async def add_income(e):
             try:
                 amt = float(amount_inc.value)
                 src = source_inc.value.strip()
                 cat = cat_inc.value
                 if not src or not cat or amt <= 0: raise ValueError("Invalid input")
-                data["income"].append({
+                tx = {
                     "amount": amt,
                     "source": src,
                     "category": cat,
                     "date": datetime.now().strftime("%Y-%m-%d")
-                })
-                save_data(data)
+                }
+                await asyncio.to_thread(store.add_transaction, "income", tx)
                 amount_inc.value = source_inc.value = ""; cat_inc.value = None
                 page.snack_bar = ft.SnackBar(ft.Text("✅ Income added!", size=14), bgcolor=colors["accent"])
                 page.snack_bar.open = True
-                show_dashboard()
+                await refresh_after_add("income", tx)
             except Exception as ex:
                 page.snack_bar = ft.SnackBar(ft.Text(f"❌ Error: {ex}", size=14), bgcolor=colors["danger"])
                 page.snack_bar.open = True
@@ -423,23 +481,23 @@ def main(page: ft.Page):
         desc_exp = create_text_field("Description", colors["danger"], width=145)
         cat_exp = create_dropdown("Category", data["categories"]["expenses"], colors["danger"])
 
-        def add_expense(e):
+        async def add_expense(e):
             try:
                 amt = float(amount_exp.value)
                 desc = desc_exp.value.strip()
                 cat = cat_exp.value
                 if not desc or not cat or amt <= 0: raise ValueError("Invalid input")
-                data["expenses"].append({
+                tx = {
                     "amount": amt,
                     "description": desc,
                     "category": cat,
                     "date": datetime.now().strftime("%Y-%m-%d")
-                })
-                save_data(data)
+                }
+                await asyncio.to_thread(store.add_transaction, "expenses", tx)
                 amount_exp.value = desc_exp.value = ""; cat_exp.value = None
                 page.snack_bar = ft.SnackBar(ft.Text("✅ Expense added!", size=14), bgcolor=colors["accent"])
                 page.snack_bar.open = True
-                show_dashboard()
+                await refresh_after_add("expense", tx)
             except Exception as ex:
                 page.snack_bar = ft.SnackBar(ft.Text(f"❌ Error: {ex}", size=14), bgcolor=colors["danger"])
                 page.snack_bar.open = True
@@ -468,87 +526,70 @@ def main(page: ft.Page):
             width=400
         )
 
-        # --- تمام تراکنش‌ها ---
-        all_tx = (
-            [{"type": "income", **tx} for tx in data["income"]] +
-            [{"type": "expense", **tx} for tx in data["expenses"]]
-        )
-
         # --- State Filters ---
         filter_type = ft.Ref[ft.Dropdown]()
         search_field = ft.Ref[ft.TextField]()
         sort_order = ft.Ref[ft.Dropdown]()
 
-        # --- تابع نمایش تراکنش‌ها ---
-        def build_transaction_list():
-            # فیلتر بر اساس نوع
-            filtered = all_tx.copy()
-            selected_filter = filter_type.current.value
-            if selected_filter == "income":
-                filtered = [t for t in filtered if t["type"] == "income"]
-            elif selected_filter == "expense":
-                filtered = [t for t in filtered if t["type"] == "expense"]
-
-            # جستجو
-            query = search_field.current.value.strip().lower()
-            if query:
-                filtered = [
-                    t for t in filtered
-                    if query in t.get("source", "").lower() or
-                       query in t.get("description", "").lower() or
-                       query in t["category"].lower()
-                ]
-
-            # مرتب‌سازی
-            sort_val = sort_order.current.value
-            if sort_val == "newest":
-                filtered.sort(key=lambda x: x["date"], reverse=True)
-            elif sort_val == "oldest":
-                filtered.sort(key=lambda x: x["date"])
-            elif sort_val == "amount_high":
-                filtered.sort(key=lambda x: x["amount"], reverse=True)
-            elif sort_val == "amount_low":
-                filtered.sort(key=lambda x: x["amount"])
+        # rows matching the current filters; only a window of them is turned into cards.
+        # added: cards inserted by refresh_after_add since rows was queried
+        tx_state = {"rows": [], "count": 0, "added": 0}
 
+        def count_matches(rows, tx_type, query):
+            # in shards mode an unfiltered list only holds the months read so far
+            return len(rows) if query else store.transaction_count(tx_type)
+
+        # --- تابع نمایش تراکنش‌ها ---
+        def build_transaction_list(start=0, count=TX_PAGE_SIZE):
             # ساخت لیست کارت‌ها
-            tx_cards = []
-            for tx in filtered:
-                amount = f"{'+' if tx['type']=='income' else '-'} {tx['amount']:,.2f}"
-                color = colors["accent"] if tx['type'] == 'income' else colors["danger"]
-                icon = "paid" if tx['type'] == 'income' else "payments"
-                label = tx.get("source", tx.get("description", "Unknown"))
-
-                card = ft.Container(
-                    content=ft.Row([
-                        ft.Container(
-                            content=ft.Icon(icon, color=color, size=20),
-                            width=40, height=40,
-                            bgcolor=f"{color}15",
-                            border_radius=20,
-                            alignment=ft.alignment.center,
-                        ),
-                        ft.Column([
-                            ft.Text(label, size=14, color=colors["text"], weight="bold", font_family="Vazirmatn"),
-                            ft.Text(f"{tx['category']} • {tx['date']}", size=12, color=colors["text_light"], font_family="Vazirmatn"),
-                        ], expand=True),
-                        ft.Text(amount, color=color, size=16, weight="bold", font_family="Vazirmatn Bold")
-                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN, vertical_alignment=ft.CrossAxisAlignment.CENTER),
-                    padding=ft.padding.symmetric(horizontal=16, vertical=12),
-                    border_radius=10,
-                    bgcolor=colors["card"],
-                    shadow=ft.BoxShadow(
-                        spread_radius=0,
-                        blur_radius=8,
-                        color=ft.Colors.with_opacity(0.1, colors["shadow"]),
-                        offset=ft.Offset(0, 2)
+            return [build_transaction_card(tx_type, tx) for tx_type, tx in tx_state["rows"][start:start + count]]
+
+        def build_transaction_card(tx_type, tx):
+            amount = f"{'+' if tx_type=='income' else '-'} {tx['amount']:,.2f}"
+            color = colors["accent"] if tx_type == 'income' else colors["danger"]
+            icon = "paid" if tx_type == 'income' else "payments"
+            label = tx.get("source", tx.get("description", "Unknown"))
+
+            return ft.Container(
+                content=ft.Row([
+                    ft.Container(
+                        content=ft.Icon(icon, color=color, size=20),
+                        width=40, height=40,
+                        bgcolor=f"{color}15",
+                        border_radius=20,
+                        alignment=ft.alignment.center,
                     ),
-                    animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
-                    on_hover=lambda e: setattr(e.control, "bgcolor", colors["hover_bg"] if e.data == "true" else colors["card"]) or e.control.update(),
-                    tooltip=f"Click to see details (not implemented yet)",
-                )
-                tx_cards.append(card)
+                    ft.Column([
+                        ft.Text(label, size=14, color=colors["text"], weight="bold", font_family="Vazirmatn"),
+                        ft.Text(f"{tx['category']} • {tx['date']}", size=12, color=colors["text_light"], font_family="Vazirmatn"),
+                    ], expand=True),
+                    ft.Text(amount, color=color, size=16, weight="bold", font_family="Vazirmatn Bold")
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN, vertical_alignment=ft.CrossAxisAlignment.CENTER),
+                padding=ft.padding.symmetric(horizontal=16, vertical=12),
+                border_radius=10,
+                bgcolor=colors["card"],
+                shadow=ft.BoxShadow(
+                    spread_radius=0,
+                    blur_radius=8,
+                    color=ft.Colors.with_opacity(0.1, colors["shadow"]),
+                    offset=ft.Offset(0, 2)
+                ),
+                animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
+                on_hover=lambda e: setattr(e.control, "bgcolor", colors["hover_bg"] if e.data == "true" else colors["card"]) or e.control.update(),
+                tooltip=f"Click to see details (not implemented yet)",
+            )
+
+        # --- جستجو با تأخیر ---
+        # wait for a pause in typing; a newer keystroke cancels the pending/running query
+        search_state = {"generation": 0, "timer": None}
 
-            return tx_cards
+        def schedule_search(_):
+            search_state["generation"] += 1
+            if search_state["timer"]:
+                search_state["timer"].cancel()
+            search_state["timer"] = threading.Timer(SEARCH_DEBOUNCE, update_tx_list, args=(search_state["generation"],))
+            search_state["timer"].daemon = True
+            search_state["timer"].start()
 
         # --- هدر با فیلترها ---
         filter_row = ft.Row([
@@ -574,7 +615,7 @@ def main(page: ft.Page):
                 dense=True,
                 content_padding=ft.padding.symmetric(horizontal=10),
                 text_size=13,
-                on_change=lambda _: update_tx_list(),
+                on_change=schedule_search,
                 prefix_icon=ft.Icons.SEARCH,
             ),
             ft.Dropdown(
@@ -595,17 +636,83 @@ def main(page: ft.Page):
         ], spacing=10, alignment=ft.MainAxisAlignment.START)
 
         # --- لیست اسکرول‌دار ---
+        def load_more_tx(e):
+            # append the next page once the user scrolls near the bottom
+            shown = len(tx_list_view.controls) - tx_state["added"]
+            if e.pixels < e.max_scroll_extent - 200:
+                return
+            if shown >= len(tx_state["rows"]):
+                # every recent month is on screen; read the older ones (unless another session,
+                # a search or a report already did) and keep scrolling. They sort after
+                # everything shown, so the cards already built stay valid
+                if len(tx_state["rows"]) >= tx_state["count"]:
+                    return
+                store.load_history()
+                tx_state["rows"] = store.find_transactions(
+                    tx_type=filter_type.current.value,
+                    query=search_field.current.value.strip().lower(),
+                    sort=sort_order.current.value,
+                )
+                # the new result has the added rows too
+                shown += tx_state["added"]
+                tx_state["added"] = 0
+            tx_list_view.controls.extend(build_transaction_list(shown))
+            tx_list_view.update()
+
         tx_list_view = ft.ListView(
             expand=True,
             spacing=8,
             padding=ft.padding.only(top=10),
+            on_scroll=load_more_tx,
+            on_scroll_interval=50,
         )
 
-        def update_tx_list():
+        @perf.timed("update_tx_list")
+        def update_tx_list(generation=None):
+            # فیلتر، جستجو و مرتب‌سازی
+            def outdated():
+                return generation is not None and generation != search_state["generation"]
+
+            query = search_field.current.value.strip().lower()
+            rows = store.find_transactions(
+                tx_type=filter_type.current.value,
+                query=query,
+                sort=sort_order.current.value,
+                cancelled=outdated,
+            )
+            if rows is None or outdated():
+                return
+            tx_state["rows"] = rows
+            tx_state["count"] = count_matches(rows, filter_type.current.value, query)
+            tx_state["added"] = 0
             tx_list_view.controls = build_transaction_list()
-            counter_text.value = f" ({len(tx_list_view.controls)} transactions)"
+            counter_text.value = f" ({tx_state['count']} transactions)"
             page.update()
 
+        # --- به‌روزرسانی پس از افزودن ---
+        # an add only touches the three totals, one new card and the counter; rebuilding the
+        # whole dashboard would make Flet diff and resend every control on it
+        @perf.timed("refresh_after_add")
+        async def refresh_after_add(tx_type, tx):
+            filters = (filter_type.current.value, search_field.current.value.strip().lower(), sort_order.current.value)
+            kind = "income" if tx_type == "income" else "expenses"
+            (total_income, total_expenses), pos = await asyncio.to_thread(
+                lambda: (store.transaction_totals(), store.tx_position(kind, tx, *filters))
+            )
+            income_value.current.value = fmt(total_income)
+            expenses_value.current.value = fmt(total_expenses)
+            net_value.current.value = fmt(total_income - total_expenses)
+            if pos is None:
+                # filtered out, the list and counter stay as they are
+                return
+            tx_state["count"] += 1
+            counter_text.value = f" ({tx_state['count']} transactions)"
+            # a row landing among the cards built so far, or right after them, gets its card now;
+            # one further down shows up the next time the list is queried
+            if pos <= len(tx_list_view.controls):
+                tx_list_view.controls.insert(pos, build_transaction_card(tx_type, tx))
+                tx_state["added"] += 1
+
         # --- عنوان با شمارنده ---
         counter_text = ft.Text("", size=14, color=colors["text_light"], font_family="Vazirmatn")
 
@@ -636,7 +743,7 @@ def main(page: ft.Page):
         )
 
         # --- اولین بار ساخت لیست ---
-        update_tx_list()
+        await asyncio.to_thread(update_tx_list)
 
         left_col = ft.Column(
             controls=[
@@ -661,38 +768,97 @@ def main(page: ft.Page):
         page.update()
     
     # --- REPORTS ---
-    def show_reports():
-        monthly = defaultdict(lambda: {"income": 0.0, "expenses": 0.0})
-        income_by_cat = defaultdict(float)
-        expense_by_cat = defaultdict(float)
-
-        for inc in data["income"]:
-            month_key = inc["date"][:7]
-            monthly[month_key]["income"] += inc["amount"]
-            income_by_cat[inc["category"]] += inc["amount"]
-
-        for exp in data["expenses"]:
-            month_key = exp["date"][:7]
-            monthly[month_key]["expenses"] += exp["amount"]
-            expense_by_cat[exp["category"]] += exp["amount"]
-
-        total_income = sum(m["income"] for m in monthly.values())
-        total_expenses = sum(m["expenses"] for m in monthly.values())
+    # chosen period survives switching screens
+    report_state = {"period": "all", "start": "", "end": ""}
+    # one preparation at a time, so opening Reports during the warm-up waits for it instead of
+    # rendering the same charts twice
+    report_lock = threading.Lock()
+
+    def report_period():
+        if report_state["period"] == "custom":
+            return report_state["start"] or None, report_state["end"] or None
+        return period_bounds(report_state["period"])
+
+    @perf.timed("prepare_reports")
+    def prepare_reports(start, end, cancelled=None):
+        # worker thread: the period's summary, with its charts put in session["charts"];
+        # None if cancelled() turned true on the way
+        with report_lock:
+            summary = store.range_summary(start, end)
+            _, _, monthly, income_by_cat, expense_by_cat = summary
+            charts = {
+                "income_pie": (get_data_version(store, "income"), create_income_pie, income_by_cat),
+                "expense_pie": (get_data_version(store, "expenses"), create_expense_pie, expense_by_cat),
+                "monthly_bar": (get_data_version(store), create_monthly_bar, monthly),
+                "net_balance_line": (get_data_version(store), create_net_balance_line, monthly),
+            }
+            for name, (version, create, chart_data) in charts.items():
+                if cancelled and cancelled():
+                    return None
+                key = (version, chart_style(session), start, end)
+                cached = session["charts"].get(name)
+                if cached is None or cached[0] != key:
+                    session["charts"][name] = (key, create(session, chart_data))
+            return summary
+
+    @perf.timed("show_reports")
+    async def show_reports():
+        start, end = report_period()
+        # disk cache reads and native chart building stay off the event loop too
+        total_income, total_expenses, monthly, income_by_cat, expense_by_cat = await asyncio.to_thread(prepare_reports, start, end)
         net_balance = total_income - total_expenses
 
-        current_hash = get_data_hash()
-        if chart_cache["last_hash"] != current_hash:
-            chart_cache["income_pie"] = create_income_pie(income_by_cat)
-            chart_cache["expense_pie"] = create_expense_pie(expense_by_cat)
-            chart_cache["monthly_bar"] = create_monthly_bar(monthly)
-            chart_cache["net_balance_line"] = create_net_balance_line(monthly)
-            chart_cache["last_hash"] = current_hash
+        # --- Period Picker ---
+        def change_period(e):
+            report_state["period"] = period_dropdown.value
+            navigate(show_reports)
+
+        def apply_custom_period(e):
+            try:
+                for field in (start_field, end_field):
+                    if field.value.strip():
+                        datetime.strptime(field.value.strip(), "%Y-%m-%d")
+            except ValueError:
+                page.snack_bar = ft.SnackBar(ft.Text("❌ Error: dates must be YYYY-MM-DD", size=14), bgcolor=colors["danger"])
+                page.snack_bar.open = True
+                page.update()
+                return
+            report_state["start"] = start_field.value.strip()
+            report_state["end"] = end_field.value.strip()
+            navigate(show_reports)
+
+        period_dropdown = ft.Dropdown(
+            value=report_state["period"],
+            options=[ft.dropdown.Option(key, label) for key, label in PERIODS.items()],
+            width=160,
+            dense=True,
+            content_padding=ft.padding.symmetric(horizontal=10),
+            text_size=13,
+            on_change=change_period,
+        )
+        start_field = create_text_field("From (YYYY-MM-DD)", colors["primary"], width=160)
+        start_field.value = report_state["start"]
+        end_field = create_text_field("To (YYYY-MM-DD)", colors["primary"], width=160)
+        end_field.value = report_state["end"]
+        period_row = ft.Row([
+            period_dropdown,
+            ft.Row([
+                start_field,
+                end_field,
+                ft.ElevatedButton(
+                    "Apply",
+                    style=ft.ButtonStyle(bgcolor=colors["primary"], color=colors["card"]),
+                    on_click=apply_custom_period,
+                    height=36
+                )
+            ], spacing=10, visible=report_state["period"] == "custom")
+        ], spacing=10, alignment=ft.MainAxisAlignment.START)
 
         stats_row = ft.Row(
             controls=[
-                StatCard("Total Income", f"{total_income:,.2f}", colors["accent"], "paid"),
-                StatCard("Total Expenses", f"{total_expenses:,.2f}", colors["danger"], "payments"),
-                StatCard("Net Balance", f"{net_balance:,.2f}", colors["primary"], "account_balance_wallet"),
+                StatCard(colors, "Total Income", f"{total_income:,.2f}", colors["accent"], "paid"),
+                StatCard(colors, "Total Expenses", f"{total_expenses:,.2f}", colors["danger"], "payments"),
+                StatCard(colors, "Net Balance", f"{net_balance:,.2f}", colors["primary"], "account_balance_wallet"),
             ],
             spacing=16,
             alignment=ft.MainAxisAlignment.CENTER,
@@ -722,8 +888,8 @@ def main(page: ft.Page):
 
         charts_row_1 = ft.Row(
             controls=[
-                chart_container("Income by Category", chart_cache["income_pie"], "pie_chart"),
-                chart_container("Expenses by Category", chart_cache["expense_pie"], "pie_chart")
+                chart_container("Income by Category", session["charts"]["income_pie"][1], "pie_chart"),
+                chart_container("Expenses by Category", session["charts"]["expense_pie"][1], "pie_chart")
             ],
             spacing=20,
             expand=True
@@ -731,8 +897,8 @@ def main(page: ft.Page):
 
         charts_row_2 = ft.Row(
             controls=[
-                chart_container("Monthly Income vs Expenses", chart_cache["monthly_bar"], "bar_chart"),
-                chart_container("Net Balance Trend", chart_cache["net_balance_line"], "show_chart")
+                chart_container("Monthly Income vs Expenses", session["charts"]["monthly_bar"][1], "bar_chart"),
+                chart_container("Net Balance Trend", session["charts"]["net_balance_line"][1], "show_chart")
             ],
             spacing=20,
             expand=True
@@ -742,6 +908,7 @@ def main(page: ft.Page):
             controls=[
                 ft.Text("Financial Reports", size=24, weight="bold", color=colors["text"], font_family="Vazirmatn Bold"),
                 ft.Divider(height=20, color="transparent"),
+                period_row,
                 stats_row,
                 ft.Divider(height=20, color="transparent"),
                 charts_row_1,
@@ -755,7 +922,7 @@ def main(page: ft.Page):
         page.update()
     
     # --- SETTING ---
-    def show_settings():
+    async def show_settings():
         status = ft.Text("", size=13, font_family="Vazirmatn")
 
         # --- Theme Selector ---
@@ -774,16 +941,58 @@ def main(page: ft.Page):
             color=colors["text"]
         )
 
-        def change_theme(e):
+        async def change_theme(e):
             new_theme = theme_dropdown.value
             if new_theme not in ["light", "dark"]:
                 return
-            data["theme"] = new_theme
-            save_data(data)
+            await asyncio.to_thread(store.set_setting, "theme", new_theme)
             status.value = "✅ Theme saved. Please restart the app to apply changes."
             status.color = colors["accent"]
             page.update()
 
+        # --- Chart Style ---
+        async def change_chart_mode(e):
+            if chart_dropdown.value not in ["image", "native"]:
+                return
+            await asyncio.to_thread(store.set_setting, "chart_mode", chart_dropdown.value)
+            status.value = "✅ Chart style saved."
+            status.color = colors["accent"]
+            page.update()
+
+        chart_dropdown = ft.Dropdown(
+            label="Charts",
+            value=data["chart_mode"],
+            options=[
+                ft.dropdown.Option("image", "Images (matplotlib)"),
+                ft.dropdown.Option("native", "Native (vector)")
+            ],
+            border_color=colors["border"],
+            focused_border_color=colors["primary"],
+            label_style=ft.TextStyle(color=colors["text_light"], size=13),
+            text_style=ft.TextStyle(color=colors["text"], size=14),
+            width=220,
+            color=colors["text"],
+            on_change=change_chart_mode
+        )
+
+        # --- Performance Panel Toggle ---
+        async def toggle_perf(e):
+            await asyncio.to_thread(store.set_setting, "perf", perf_switch.value)
+            perf.enable(perf_switch.value)
+            perf_panel.visible = perf_switch.value
+            perf_refreshing(perf_switch.value)
+            status.value = f"✅ Performance panel {'on' if perf_switch.value else 'off'}."
+            status.color = colors["accent"]
+            page.update()
+
+        perf_switch = ft.Switch(
+            label="Performance panel",
+            value=perf.enabled,
+            active_color=colors["primary"],
+            label_style=ft.TextStyle(color=colors["text"], size=13),
+            on_change=toggle_perf
+        )
+
         theme_button = ft.ElevatedButton(
             "Apply Theme",
             style=ft.ButtonStyle(
@@ -799,7 +1008,7 @@ def main(page: ft.Page):
             list_view = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO)
             new_field = create_text_field(f"New {cat_type.capitalize()} Category", color, width=200)
 
-            def add_cat(e):
+            async def add_cat(e):
                 val = new_field.value.strip()
                 if not val:
                     status.value = "⚠️ Category name cannot be empty."
@@ -808,22 +1017,63 @@ def main(page: ft.Page):
                     status.value = f"⚠️ Category '{val}' already exists."
                     status.color = colors["text_light"]
                 else:
-                    data["categories"][cat_type].append(val)
-                    save_data(data)
+                    await asyncio.to_thread(store.add_category, cat_type, val)
                     new_field.value = ""
                     status.value = f"✅ '{val}' added."
                     status.color = colors["accent"]
                     refresh_categories()
                 page.update()
 
-            def delete_cat(name):
-                data["categories"][cat_type].remove(name)
-                save_data(data)
-                status.value = f"🗑️ '{name}' deleted."
+            async def delete_cat(name):
+                if await asyncio.to_thread(store.category_in_use, cat_type, name):
+                    # its transactions move to "Other" (or the first category left) instead of dangling
+                    others = [c for c in data["categories"][cat_type] if c != name]
+                    if not others:
+                        status.value = f"⚠️ '{name}' is the last category and still has transactions."
+                        status.color = colors["text_light"]
+                        page.update()
+                        return
+                    target = "Other" if "Other" in others else others[0]
+                    # moving every transaction over can take a while on a long history
+                    await asyncio.to_thread(store.delete_category, cat_type, name, reassign_to=target)
+                    status.value = f"🗑️ '{name}' deleted, its transactions moved to '{target}'."
+                else:
+                    await asyncio.to_thread(store.delete_category, cat_type, name)
+                    status.value = f"🗑️ '{name}' deleted."
                 status.color = colors["danger"]
                 refresh_categories()
                 page.update()
 
+            def rename_cat(name):
+                name_field = create_text_field("New name", color, width=260)
+                name_field.value = name
+
+                async def save(e):
+                    new = name_field.value.strip()
+                    page.close(dialog)
+                    if not new or new == name:
+                        return
+                    merged = new in data["categories"][cat_type]
+                    await asyncio.to_thread(store.rename_category, cat_type, name, new)
+                    status.value = f"✅ '{name}' merged into '{new}'." if merged else f"✅ '{name}' renamed to '{new}'."
+                    status.color = colors["accent"]
+                    refresh_categories()
+                    page.update()
+
+                dialog = ft.AlertDialog(
+                    title=ft.Text(f"Rename '{name}'", size=16, weight="bold", color=colors["text"]),
+                    content=ft.Column([
+                        name_field,
+                        ft.Text("Use an existing name to merge the two.", size=12, color=colors["text_light"])
+                    ], tight=True, spacing=8),
+                    actions=[
+                        ft.TextButton("Cancel", on_click=lambda e: page.close(dialog)),
+                        ft.TextButton("Save", on_click=save)
+                    ],
+                    bgcolor=colors["card"]
+                )
+                page.open(dialog)
+
             def refresh_categories():
                 list_view.controls.clear()
                 for cat in data["categories"][cat_type]:
@@ -837,12 +1087,20 @@ def main(page: ft.Page):
                                 alignment=ft.alignment.center
                             ),
                             title=ft.Text(cat, size=14, color=colors["text"]),
-                            trailing=ft.IconButton(
-                                icon="delete",
-                                icon_size=16,
-                                icon_color=colors["danger"],
-                                on_click=lambda e, c=cat: delete_cat(c)
-                            ),
+                            trailing=ft.Row([
+                                ft.IconButton(
+                                    icon="edit",
+                                    icon_size=16,
+                                    icon_color=colors["text_light"],
+                                    on_click=lambda e, c=cat: rename_cat(c)
+                                ),
+                                ft.IconButton(
+                                    icon="delete",
+                                    icon_size=16,
+                                    icon_color=colors["danger"],
+                                    on_click=lambda e, c=cat: page.run_task(delete_cat, c)
+                                )
+                            ], spacing=0, tight=True),
                         )
                     )
                 page.update()
@@ -889,6 +1147,10 @@ def main(page: ft.Page):
                     theme_dropdown,
                     theme_button
                 ], spacing=10, alignment=ft.MainAxisAlignment.START),
+                ft.Row([
+                    chart_dropdown,
+                    perf_switch
+                ], spacing=10, alignment=ft.MainAxisAlignment.START),
                 ft.Container(
                     content=ft.Text(
                         "💡 Theme changes will take effect after restarting the app.",
@@ -920,7 +1182,7 @@ def main(page: ft.Page):
                 ),
                 ft.ListTile(
                     title=ft.Text("Data File", weight="bold", color=colors["text"]),
-                    subtitle=ft.Text(f"Location: {os.path.abspath(DATA_FILE)}", size=11, color=colors["text_light"])
+                    subtitle=ft.Text(f"Location: {os.path.abspath(store.path or DATA_FILE)}", size=11, color=colors["text_light"])
                 )
             ]),
             padding=16,
@@ -963,11 +1225,42 @@ def main(page: ft.Page):
         page.update()
 
     # --- Navigation Handler ---
-    def on_rail_change(e):
-        index = e.control.selected_index
+    # views load their data off the event loop; switching views cancels the one still loading
+    # and drops chart renders that haven't started, so a big report never holds up a click
+    nav_state = {"task": None}
+
+    def navigate(view, keep_renders=False):
+        if view is not show_reports:
+            warmup_state["cancelled"] = True
+        if nav_state["task"] is not None:
+            nav_state["task"].cancel()
+        if not keep_renders:
+            for future in list(session["renders"]):
+                future.cancel()
+        nav_state["task"] = page.run_task(view)
+        return nav_state["task"]
+
+    async def on_rail_change(e):
         views = [show_dashboard, show_reports, show_settings]
-        views[index]()
-        content_area.update()
+        view = views[e.control.selected_index]
+        # renders still pending are the warm-up's, for exactly this page
+        navigate(view, keep_renders=view is show_reports)
+
+    # --- Reports Warm-Up ---
+    # WARMUP_DELAY after the dashboard has painted, Reports for the current period is
+    # summarized and its charts rendered into the session cache on a background thread, so the
+    # first visit only lays out controls. Going to any other view cancels it between steps,
+    # along with its renders that haven't started.
+    warmup_state = {"cancelled": False}
+
+    def warm_up_reports():
+        time.sleep(WARMUP_DELAY)
+        if warmup_state["cancelled"]:
+            return
+        try:
+            prepare_reports(*report_period(), cancelled=lambda: warmup_state["cancelled"])
+        except Exception as e:
+            print(f"Reports warm-up error: {e}")
 
     rail.on_change = on_rail_change
 
@@ -979,10 +1272,45 @@ def main(page: ft.Page):
         ], spacing=0, expand=True)
     )
 
-    show_dashboard()
+    try:
+        await asyncio.wrap_future(navigate(show_dashboard))
+    except asyncio.CancelledError:
+        # the user switched views before the dashboard finished loading
+        pass
+    else:
+        warmup_state["cancelled"] = False
+        threading.Thread(target=warm_up_reports, daemon=True, name="finely-warmup").start()
+    report_startup()
 
 def run_app():
-    ft.app(target=main, assets_dir="assets", view=ft.FLET_APP)
+    multiprocessing.freeze_support()
+    start_loading_data()
+    try:
+        ft.app(target=main, assets_dir="assets", view=ft.FLET_APP)
+    finally:
+        # write any edits still waiting in the saver before the process goes away
+        flush_saves()
+        if chart_pool is not None:
+            chart_pool.shutdown(wait=False, cancel_futures=True)
+
+# --- Server Mode ---
+# `finely serve`: every browser tab is its own session; ?profile=<name> picks the data dir
+async def serve_session(page: ft.Page):
+    try:
+        store = await asyncio.to_thread(get_store, page.query.get("profile") or DEFAULT_PROFILE)
+    except ValueError as e:
+        page.add(ft.Text(f"❌ Error: {e}", size=14))
+        return
+    await main(page, store)
+
+def run_server(host=None, port=8550):
+    multiprocessing.freeze_support()
+    try:
+        ft.app(target=serve_session, assets_dir="assets", view=None, host=host, port=port)
+    finally:
+        flush_stores()
+        if chart_pool is not None:
+            chart_pool.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     run_app()
\ No newline at end of file
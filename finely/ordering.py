@@ -0,0 +1,74 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+# --- Order Index ---
+# Row numbers of data[kind] kept sorted by date and by amount, so the dashboard sort dropdown
+# only picks an iteration direction. Inserts go after equal keys to stay stable.
+KINDS = ("income", "expenses")
+FIELDS = ("date", "amount")
+
+# sort option -> (field, descending)
+SORTS = {
+    "newest": ("date", True),
+    "oldest": ("date", False),
+    "amount_high": ("amount", True),
+    "amount_low": ("amount", False),
+}
+
+class FieldView:
+    # row -> tx[field] for plain lists of dicts
+    def __init__(self, txs, field):
+        self.txs = txs
+        self.field = field
+
+    def __getitem__(self, row):
+        return self.txs[row][self.field]
+
+def sort_key(txs, tx, field):
+    return txs.sort_key(tx, field) if hasattr(txs, "sort_key") else tx[field]
+
+def key_column(txs, field):
+    # columnar stores hand out their typed column directly (dates as ordinals)
+    if hasattr(txs, "sort_keys"):
+        return txs.sort_keys(field)
+    return FieldView(txs, field)
+
+class OrderIndex:
+    def __init__(self):
+        self.keys = {(kind, field): [] for kind in KINDS for field in FIELDS}
+        self.rows = {(kind, field): array("I") for kind in KINDS for field in FIELDS}
+        self.stores = {}
+
+    def add_tx(self, kind, tx, row):
+        for field in FIELDS:
+            key = sort_key(self.stores.get(kind), tx, field)
+            keys = self.keys[(kind, field)]
+            pos = bisect_right(keys, key)
+            keys.insert(pos, key)
+            self.rows[(kind, field)].insert(pos, row)
+
+    def rank(self, kind, field, key, descending=False, ties_before=False):
+        # how many rows of kind come before key in that direction; equal keys count if ties_before
+        keys = self.keys[(kind, field)]
+        if descending:
+            return len(keys) - (bisect_left(keys, key) if ties_before else bisect_right(keys, key))
+        return bisect_right(keys, key) if ties_before else bisect_left(keys, key)
+
+    def ordered_rows(self, kind, field):
+        # ascending; a copy of the array (one memcpy), so later inserts can't shift it
+        return self.rows[(kind, field)][:]
+
+    @classmethod
+    def from_data(cls, data):
+        index = cls()
+        for kind in KINDS:
+            txs = index.stores[kind] = data[kind]
+            for field in FIELDS:
+                keys = key_column(txs, field)
+                rows = sorted(range(len(txs)), key=keys.__getitem__)
+                if isinstance(keys, array):
+                    index.keys[(kind, field)] = array(keys.typecode, (keys[r] for r in rows))
+                else:
+                    index.keys[(kind, field)] = [keys[r] for r in rows]
+                index.rows[(kind, field)] = array("I", rows)
+        return index
@@ -0,0 +1,92 @@
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+# --- Performance Instrumentation ---
+# Opt-in wall time and call counts for the hot paths. Turned on with FINELY_PERF=1 or the
+# Settings toggle; while off, a wrapped call costs one global lookup and a branch.
+# Every timed call is appended to DATA_DIR/perf.log (rotated at 1 MB, 3 backups kept).
+
+enabled = os.getenv("FINELY_PERF") == "1"
+LOG_MAX_BYTES = 1 << 20
+LOG_BACKUPS = 3
+
+stats_lock = threading.Lock()
+# name -> [calls, total ms, max ms, last ms]
+stats = {}
+logger = None
+
+def enable(on):
+    global enabled
+    enabled = bool(on)
+
+def get_logger():
+    global logger
+    if logger is None:
+        from finely.storage import DATA_DIR
+        logger = logging.getLogger("finely.perf")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        try:
+            handler = RotatingFileHandler(os.path.join(DATA_DIR, "perf.log"), maxBytes=LOG_MAX_BYTES,
+                                          backupCount=LOG_BACKUPS, encoding="utf-8")
+        except OSError as e:
+            print(f"Perf log error: {e}")
+            handler = logging.NullHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+    return logger
+
+def record(name, ms):
+    with stats_lock:
+        entry = stats.get(name)
+        if entry is None:
+            entry = stats[name] = [0, 0.0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += ms
+        entry[2] = max(entry[2], ms)
+        entry[3] = ms
+    get_logger().info("%s %.2f ms", name, ms)
+
+def wrap(name, fn):
+    if inspect.iscoroutinefunction(fn):
+        # time the awaited call, not just creating the coroutine
+        @functools.wraps(fn)
+        async def timed_coroutine(*args, **kwargs):
+            if not enabled:
+                return await fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                record(name, (time.perf_counter() - start) * 1000)
+        return timed_coroutine
+
+    @functools.wraps(fn)
+    def timed_call(*args, **kwargs):
+        if not enabled:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(name, (time.perf_counter() - start) * 1000)
+    return timed_call
+
+def timed(name):
+    return lambda fn: wrap(name, fn)
+
+def summary(limit=10):
+    # rows of (name, calls, total ms, avg ms, max ms, last ms), slowest total first
+    with stats_lock:
+        rows = [(name, calls, total, total / calls, peak, last) for name, (calls, total, peak, last) in stats.items()]
+    rows.sort(key=lambda row: -row[2])
+    return rows[:limit]
+
+def reset():
+    with stats_lock:
+        stats.clear()
@@ -0,0 +1,58 @@
+from array import array
+from collections import defaultdict
+
+# --- Search Index ---
+# Transactions repeat the same few labels and categories, so the trigram index is built over
+# distinct lowercased strings and each string keeps the rows (per type) it appears on.
+KINDS = ("income", "expenses")
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SearchIndex:
+    def __init__(self):
+        self.text_ids = {}
+        self.texts = []
+        self.trigrams = defaultdict(set)
+        self.rows = {kind: {} for kind in KINDS}
+
+    def text_id(self, text):
+        tid = self.text_ids.get(text)
+        if tid is None:
+            tid = self.text_ids[text] = len(self.texts)
+            self.texts.append(text)
+            for gram in trigrams(text):
+                self.trigrams[gram].add(tid)
+        return tid
+
+    def add_tx(self, kind, tx, row):
+        label = tx.get("source", tx.get("description", ""))
+        for text in {label.lower(), tx["category"].lower()}:
+            tid = self.text_id(text)
+            rows = self.rows[kind].get(tid)
+            if rows is None:
+                rows = self.rows[kind][tid] = array("I")
+            rows.append(row)
+
+    def search(self, kind, query):
+        # row numbers in data[kind] whose label or category contains query, in insertion order
+        if len(query) >= 3:
+            postings = sorted((self.trigrams.get(gram, set()) for gram in trigrams(query)), key=len)
+            candidates = postings[0].intersection(*postings[1:]) if postings else set()
+        else:
+            # one or two characters: check the distinct strings, never the transactions
+            candidates = range(len(self.texts))
+        kind_rows = self.rows[kind]
+        matched = set()
+        for tid in candidates:
+            if tid in kind_rows and query in self.texts[tid]:
+                matched.update(kind_rows[tid])
+        return sorted(matched)
+
+    @classmethod
+    def from_data(cls, data):
+        index = cls()
+        for kind in KINDS:
+            for row, tx in enumerate(data[kind]):
+                index.add_tx(kind, tx, row)
+        return index
@@ -0,0 +1,159 @@
+import json
+import os
+
+# --- Month Shards ---
+# "shards" storage mode: DATA_DIR/shards/YYYY-MM.json holds one month of transactions and
+# manifest.json holds the settings plus per-month counts and category totals. Startup reads
+# the manifest and the most recent months only; reports come straight from the manifest and
+# older months are read when something needs every transaction (search, other sorts, export).
+KINDS = ("income", "expenses")
+MANIFEST = "manifest.json"
+
+def write_json(path, value):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(value, file, indent=1)
+    os.replace(tmp_path, path)
+
+class ShardStore:
+    def __init__(self, directory, recent_months):
+        self.dir = directory
+        self.recent_months = recent_months
+        self.settings = {}
+        # month -> kind -> {"count": n, "by_category": {category: amount}}
+        self.stats = {}
+        # months read from disk (or created this session) -> kind -> [tx]
+        self.months = {}
+        self.dirty = set()
+        self.views = {kind: ShardedTransactions(self, kind) for kind in KINDS}
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def exists(self):
+        return os.path.exists(self.path(MANIFEST))
+
+    def open(self):
+        with open(self.path(MANIFEST), "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+        self.settings = manifest["settings"]
+        self.stats = manifest["months"]
+        recent = sorted(self.stats)[-self.recent_months:] if self.recent_months > 0 else []
+        self.read_months(recent)
+
+    def read_months(self, months):
+        # months are read oldest first and go in front of everything already in the views
+        loaded = {kind: [] for kind in KINDS}
+        for month in sorted(months):
+            try:
+                with open(self.path(f"{month}.json"), "r", encoding="utf-8") as file:
+                    shard = json.load(file)
+            except FileNotFoundError:
+                shard = {}
+            self.months[month] = {kind: shard.get(kind, []) for kind in KINDS}
+            for kind in KINDS:
+                loaded[kind] += self.months[month][kind]
+        for kind, view in self.views.items():
+            view.rows = loaded[kind] + view.rows
+
+    def unloaded_months(self):
+        return [month for month in self.stats if month not in self.months]
+
+    def load_history(self):
+        # read every month not read yet; False if there was nothing left
+        months = self.unloaded_months()
+        if not months:
+            return False
+        self.read_months(months)
+        return True
+
+    def needs_history(self, tx):
+        # writing into an unread month would rewrite its file without its old rows
+        month = tx["date"][:7]
+        return month in self.stats and month not in self.months
+
+    def add(self, kind, tx):
+        month = tx["date"][:7]
+        self.months.setdefault(month, {k: [] for k in KINDS})[kind].append(tx)
+        stats = self.stats.setdefault(month, {k: {"count": 0, "by_category": {}} for k in KINDS})[kind]
+        stats["count"] += 1
+        stats["by_category"][tx["category"]] = stats["by_category"].get(tx["category"], 0.0) + tx["amount"]
+        self.dirty.add(month)
+
+    def recategorize(self, kind, old, new):
+        # manifest totals and month rows; rows are replaced, never edited, since a snapshot
+        # being saved may still hold the old dicts
+        for month, stats in self.stats.items():
+            by_category = stats[kind]["by_category"]
+            if old in by_category:
+                by_category[new] = by_category.get(new, 0.0) + by_category.pop(old)
+                self.dirty.add(month)
+        replaced = {}
+        for month, shard in self.months.items():
+            txs = shard[kind]
+            for i, tx in enumerate(txs):
+                if tx["category"] == old:
+                    txs[i] = replaced[id(tx)] = {**tx, "category": new}
+                    self.dirty.add(month)
+        # the view lists the same dicts as the months
+        rows = self.views[kind].rows
+        for i, tx in enumerate(rows):
+            if id(tx) in replaced:
+                rows[i] = replaced[id(tx)]
+
+    def count(self, kind):
+        return sum(stats[kind]["count"] for stats in self.stats.values())
+
+    def sums(self):
+        # (kind, month, category, amount) rows for Aggregates.from_sums, without reading any shard
+        return [(kind, month, category, amount)
+                for month, stats in self.stats.items()
+                for kind in KINDS
+                for category, amount in stats[kind]["by_category"].items()]
+
+    def snapshot(self, settings):
+        # what save() needs, copied so the writer never sees later edits
+        months = {month: {kind: list(txs) for kind, txs in self.months[month].items()} for month in self.dirty}
+        self.dirty = set()
+        return {
+            "settings": json.loads(json.dumps(settings)),
+            "months": json.loads(json.dumps(self.stats)),
+            "shards": months,
+        }
+
+    def save(self, snapshot):
+        # shards first, manifest last: the manifest never describes a shard that isn't on disk
+        os.makedirs(self.dir, exist_ok=True)
+        for month, shard in snapshot["shards"].items():
+            write_json(self.path(f"{month}.json"), shard)
+        write_json(self.path(MANIFEST), {"settings": snapshot["settings"], "months": snapshot["months"]})
+
+class ShardedTransactions:
+    # list-like view over the months read so far, oldest month first, then this session's adds
+    def __init__(self, store, kind):
+        self.store = store
+        self.kind = kind
+        self.rows = []
+
+    def append(self, tx):
+        self.store.add(self.kind, tx)
+        self.rows.append(tx)
+
+    def extend(self, txs):
+        for tx in txs:
+            self.append(tx)
+
+    def copy(self):
+        return list(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows) or self.store.count(self.kind) > 0
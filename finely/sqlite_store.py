@@ -0,0 +1,287 @@
+import json
+import sqlite3
+import threading
+
+# --- SQLite Storage ---
+# Transactions live in one indexed table, categories and theme in a small key/value table.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    label TEXT NOT NULL,
+    category TEXT NOT NULL,
+    date TEXT NOT NULL,
+    month TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tx_type_date ON transactions(type, date);
+CREATE INDEX IF NOT EXISTS idx_tx_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS idx_tx_month ON transactions(month, type);
+CREATE INDEX IF NOT EXISTS idx_tx_category ON transactions(category, type);
+CREATE INDEX IF NOT EXISTS idx_tx_type_amount ON transactions(type, amount);
+CREATE INDEX IF NOT EXISTS idx_tx_amount ON transactions(amount);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# data key -> (type column value, label key)
+KINDS = {
+    "income": ("income", "source"),
+    "expenses": ("expense", "description"),
+}
+
+db_lock = threading.RLock()
+
+def open_database(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with db_lock:
+        conn.executescript(SCHEMA)
+        migrated = conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone() is not None
+    return conn, not migrated
+
+def tx_row(type_, tx):
+    return (type_, tx["amount"], tx.get("source", tx.get("description", "")), tx["category"], tx["date"], tx["date"][:7])
+
+def import_data(conn, data):
+    with db_lock:
+        for kind, (type_, _) in KINDS.items():
+            conn.executemany(
+                "INSERT INTO transactions (type, amount, label, category, date, month) VALUES (?, ?, ?, ?, ?, ?)",
+                (tx_row(type_, tx) for tx in data[kind])
+            )
+        save_meta(conn, data)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated', '1')")
+        conn.commit()
+
+def save_meta(conn, data):
+    with db_lock:
+        # every setting, i.e. everything that isn't a transaction list
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, json.dumps(value)) for key, value in data.items() if key not in KINDS]
+        )
+        conn.commit()
+
+def build_data(conn, defaults):
+    with db_lock:
+        meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    categories = json.loads(meta["categories"]) if "categories" in meta else json.loads(json.dumps(defaults["categories"]))
+    for cat_type in defaults["categories"]:
+        categories.setdefault(cat_type, list(defaults["categories"][cat_type]))
+    data = {
+        "income": SQLiteTransactions(conn, "income"),
+        "expenses": SQLiteTransactions(conn, "expenses"),
+        "categories": categories,
+    }
+    for key, value in defaults.items():
+        if key not in data:
+            data[key] = json.loads(meta[key]) if key in meta else value
+    return data
+
+class SQLiteTransactions:
+    # list-like view over one transaction type, so data["income"] keeps working for the UI
+    def __init__(self, conn, kind):
+        self.conn = conn
+        self.kind = kind
+        self.type, self.label_key = KINDS[kind]
+        # (tx, id) of the last append, so tx_position can place the row it just added
+        self.last_added = None
+
+    def row_to_tx(self, row):
+        amount, label, category, date = row
+        return {"amount": amount, self.label_key: label, "category": category, "date": date}
+
+    def append(self, tx):
+        with db_lock:
+            cursor = self.conn.execute(
+                "INSERT INTO transactions (type, amount, label, category, date, month) VALUES (?, ?, ?, ?, ?, ?)",
+                tx_row(self.type, tx)
+            )
+            self.last_added = (tx, cursor.lastrowid)
+
+    def row_id(self, tx):
+        # id of the row just appended for tx; if another add came in since, the newest identical row
+        last = self.last_added
+        if last and last[0] is tx:
+            return last[1]
+        with db_lock:
+            return self.conn.execute(
+                "SELECT MAX(id) FROM transactions WHERE type = ? AND amount = ? AND label = ? AND category = ? AND date = ?",
+                tx_row(self.type, tx)[:5]
+            ).fetchone()[0]
+
+    def extend(self, txs):
+        with db_lock:
+            self.conn.executemany(
+                "INSERT INTO transactions (type, amount, label, category, date, month) VALUES (?, ?, ?, ?, ?, ?)",
+                (tx_row(self.type, tx) for tx in txs)
+            )
+
+    def recategorize(self, old, new):
+        with db_lock:
+            self.conn.execute(
+                "UPDATE transactions SET category = ? WHERE category = ? AND type = ?", (new, old, self.type)
+            )
+
+    def __len__(self):
+        with db_lock:
+            return self.conn.execute("SELECT COUNT(*) FROM transactions WHERE type = ?", (self.type,)).fetchone()[0]
+
+    def __iter__(self):
+        with db_lock:
+            rows = self.conn.execute(
+                "SELECT amount, label, category, date FROM transactions WHERE type = ? ORDER BY id", (self.type,)
+            ).fetchall()
+        return (self.row_to_tx(row) for row in rows)
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def __bool__(self):
+        with db_lock:
+            return self.conn.execute("SELECT 1 FROM transactions WHERE type = ? LIMIT 1", (self.type,)).fetchone() is not None
+
+# --- Queries ---
+def month_category_sums(conn):
+    with db_lock:
+        rows = conn.execute(
+            "SELECT type, month, category, SUM(amount) FROM transactions GROUP BY type, month, category"
+        ).fetchall()
+    return [("income" if type_ == "income" else "expenses", month, category, amount)
+            for type_, month, category, amount in rows]
+
+def day_category_sums(conn):
+    with db_lock:
+        rows = conn.execute(
+            "SELECT type, date, category, SUM(amount) FROM transactions GROUP BY type, date, category"
+        ).fetchall()
+    return [("income" if type_ == "income" else "expenses", day, category, amount)
+            for type_, day, category, amount in rows]
+
+SORT_SQL = {
+    "newest": "date DESC, id",
+    "oldest": "date, id",
+    "amount_high": "amount DESC, id",
+    "amount_low": "amount, id",
+}
+# sort -> (column, comparison) a row has to win to come before another; ties go by id
+SORT_BEFORE = {
+    "newest": ("date", ">"),
+    "oldest": ("date", "<"),
+    "amount_high": ("amount", ">"),
+    "amount_low": ("amount", "<"),
+}
+
+# rows per query when a result is iterated in full
+RESULT_CHUNK = 5000
+
+def row_to_pair(type_, amount, label, category, date):
+    return type_, {"amount": amount,
+                   ("source" if type_ == "income" else "description"): label,
+                   "category": category, "date": date}
+
+def filter_sql(tx_type="all", query=""):
+    # -> (WHERE conditions, params) for a dashboard filter
+    where = []
+    params = []
+    if tx_type in ("income", "expense"):
+        where.append("type = ?")
+        params.append(tx_type)
+    if query:
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where.append("(label LIKE ? ESCAPE '\\' OR category LIKE ? ESCAPE '\\')")
+        params += [pattern, pattern]
+    return where, params
+
+class SQLiteResults:
+    # a query's matches as a sequence of (type, tx) pairs, read a window at a time with
+    # LIMIT/OFFSET so a page never costs the whole result. Rows added later are left out
+    # (id <= the newest id when the query ran) so offsets stay put while paging
+    def __init__(self, conn, tx_type="all", query="", sort="newest"):
+        self.conn = conn
+        where, self.params = filter_sql(tx_type, query)
+        with db_lock:
+            last_id = conn.execute("SELECT MAX(id) FROM transactions").fetchone()[0] or 0
+        # unary + keeps the planner on the sort order's index instead of the rowid range
+        where.append("+id <= ?")
+        self.params.append(last_id)
+        self.where = " WHERE " + " AND ".join(where)
+        self.order = " ORDER BY " + SORT_SQL.get(sort, "id")
+        self.total = None
+
+    def window(self, offset, limit):
+        sql = "SELECT type, amount, label, category, date FROM transactions" + self.where + self.order + " LIMIT ? OFFSET ?"
+        with db_lock:
+            rows = self.conn.execute(sql, self.params + [limit, offset]).fetchall()
+        return [row_to_pair(*row) for row in rows]
+
+    def __len__(self):
+        if self.total is None:
+            with db_lock:
+                self.total = self.conn.execute("SELECT COUNT(*) FROM transactions" + self.where, self.params).fetchone()[0]
+        return self.total
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(*index.indices(len(self)))
+            if not positions:
+                return []
+            low, high = min(positions[0], positions[-1]), max(positions[0], positions[-1])
+            rows = self.window(low, high - low + 1)
+            return [rows[i - low] for i in positions]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return self.window(index, 1)[0]
+
+    def __iter__(self):
+        for offset in range(0, len(self), RESULT_CHUNK):
+            yield from self.window(offset, RESULT_CHUNK)
+
+def find_transactions(conn, tx_type="all", query="", sort="newest"):
+    return SQLiteResults(conn, tx_type, query, sort)
+
+def tx_position(conn, row_id, tx_type="all", query="", sort="newest"):
+    # where row row_id sits in find_transactions(tx_type, query, sort): the matching rows that
+    # sort before it, counted as two index ranges (strictly before, then ties with a lower id);
+    # one range with an OR would be a much slower multi-index scan
+    where, params = filter_sql(tx_type, query)
+    column, op = SORT_BEFORE.get(sort, ("id", "<"))
+    with db_lock:
+        value = conn.execute(f"SELECT {column} FROM transactions WHERE id = ?", (row_id,)).fetchone()[0]
+        count = "SELECT COUNT(*) FROM transactions WHERE " + " AND ".join(where + ["{}"])
+        return conn.execute(
+            f"SELECT ({count.format(f'{column} {op} ?')}) + ({count.format(f'{column} = ? AND id < ?')})",
+            params + [value] + params + [value, row_id]
+        ).fetchone()[0]
+
+def iter_transactions(conn, start=None, end=None, categories=None, chunk=5000):
+    # keyset pagination: the lock is only held per chunk, never across a slow consumer
+    where = ["id > ?"]
+    params = []
+    if start:
+        where.append("date >= ?")
+        params.append(start)
+    if end:
+        where.append("date <= ?")
+        params.append(end)
+    if categories:
+        where.append(f"category IN ({', '.join('?' * len(categories))})")
+        params += list(categories)
+    sql = ("SELECT id, type, amount, label, category, date FROM transactions WHERE "
+           + " AND ".join(where) + " ORDER BY id LIMIT ?")
+    last_id = 0
+    while True:
+        with db_lock:
+            rows = conn.execute(sql, [last_id] + params + [chunk]).fetchall()
+        for last_id, type_, amount, label, category, date in rows:
+            yield type_, {"amount": amount,
+                          ("source" if type_ == "income" else "description"): label,
+                          "category": category, "date": date}
+        if len(rows) < chunk:
+            return
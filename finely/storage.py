@@ -0,0 +1,757 @@
+import atexit
+import copy
+import heapq
+import itertools
+import json
+import os
+import platform
+import threading
+import time
+from array import array
+from finely import binfile, perf, sqlite_store
+from finely.shards import ShardStore, ShardedTransactions
+from finely.aggregates import Aggregates
+from finely.columnar import TransactionColumns
+from finely.ordering import OrderIndex, SORTS, key_column, sort_key
+from finely.search import SearchIndex
+from finely.timeline import DailySums
+
+# --- Data File ---
+def get_data_dir():
+    if os.getenv("FINELY_DATA_DIR"):
+        return os.getenv("FINELY_DATA_DIR")
+    if platform.system() == "Windows":
+        return os.path.join(os.getenv("APPDATA"), "Finely")
+    elif platform.system() == "Darwin":
+        return os.path.expanduser("~/Library/Application Support/Finely")
+    else:  # Linux
+        return os.path.expanduser("~/.local/share/Finely")
+
+DATA_DIR = get_data_dir()
+os.makedirs(DATA_DIR, exist_ok=True)
+
+DATA_FILE = os.path.join(DATA_DIR, "data.json")
+default_data = {
+    "income": [],
+    "expenses": [],
+    "categories": {
+        "income": ["Salary", "Freelance", "Investments", "Gifts", "Other"],
+        "expenses": ["Food", "Transport", "Utilities", "Entertainment", "Shopping", "Health", "Other"]
+    },
+    "theme": "light",
+    # "image": matplotlib PNGs, "native": Flet vector charts
+    "chart_mode": "image",
+    # timing panel and DATA_DIR/perf.log, see perf.py
+    "perf": False
+}
+
+# --- Storage Mode ---
+# "json": every change rewrites data.json
+# "journal": every change is appended to data.journal, data.json is only a periodic snapshot
+# "sqlite": transactions live in an indexed data.db, migrated once from data.json
+# "shards": one file per month plus a manifest, older months read on demand (see shards.py)
+# "binary": data.fnly, memory-mapped columns decoded on first use (see binfile.py)
+STORAGE_MODE = os.getenv("FINELY_STORAGE", "json").lower()
+
+# keep transactions in compact typed columns instead of one dict each (see columnar.py)
+COLUMNAR = os.getenv("FINELY_COLUMNAR", "0") == "1"
+
+DB_FILE = os.path.join(DATA_DIR, "data.db")
+BIN_FILE = os.path.join(DATA_DIR, "data.fnly")
+JOURNAL_FILE = os.path.join(DATA_DIR, "data.journal")
+JOURNAL_COMPACTING_FILE = JOURNAL_FILE + ".compacting"
+JOURNAL_COMPACT_THRESHOLD = int(os.getenv("FINELY_JOURNAL_COMPACT", "5000"))
+SHARD_DIR = os.path.join(DATA_DIR, "shards")
+# months read at startup in "shards" mode
+RECENT_MONTHS = int(os.getenv("FINELY_RECENT_MONTHS", "3"))
+
+journal_lock = threading.Lock()
+journal_state = {
+    "seq": 0,            # seq of the last change applied in memory
+    "snapshot_seq": 0,   # seq already contained in data.json
+    "entries": 0,        # entries waiting in data.journal
+    "compacting": False
+}
+
+# --- JSON Functions ---
+@perf.timed("load_data")
+def load_data():
+    if STORAGE_MODE == "sqlite":
+        return load_sqlite_data()
+    if STORAGE_MODE == "shards":
+        return load_shard_data()
+    if STORAGE_MODE == "binary":
+        return load_binary_data()
+    return load_json_data()
+
+def read_data_file(path):
+    # parsed data.json with missing keys filled from default_data; None if it can't be read
+    if not os.path.exists(path):
+        return copy.deepcopy(default_data)
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+            for key in default_data:
+                if key == "categories":
+                    for cat_type in default_data["categories"]:
+                        if cat_type not in data["categories"]:
+                            data["categories"][cat_type] = default_data["categories"][cat_type]
+                else:
+                    if key not in data:
+                        data[key] = default_data[key]
+        return data
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return None
+
+def load_json_data():
+    data = read_data_file(DATA_FILE)
+    if data is None:
+        return copy.deepcopy(default_data)
+
+    snapshot_seq = data.pop("journal_seq", 0)
+    journal_state["seq"] = journal_state["snapshot_seq"] = snapshot_seq
+    journal_state["entries"] = 0
+    # replay in every mode so switching back to "json" never drops journaled changes
+    if replay_journal(data, snapshot_seq):
+        if STORAGE_MODE == "json" or (STORAGE_MODE == "journal" and os.path.exists(JOURNAL_COMPACTING_FILE)):
+            # leftover journal or an interrupted compaction: fold it into a fresh snapshot
+            save_data(data)
+            clear_journal()
+    if COLUMNAR:
+        to_columns(data)
+    return data
+
+def to_columns(data):
+    try:
+        for kind in ("income", "expenses"):
+            if isinstance(data[kind], list):
+                data[kind] = TransactionColumns(kind, data[kind])
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"Columnar load error, keeping plain lists: {e}")
+        for kind in ("income", "expenses"):
+            if isinstance(data[kind], TransactionColumns):
+                data[kind] = list(data[kind])
+
+def dump_data(data_to_save, file):
+    if not any(isinstance(data_to_save.get(kind), TransactionColumns) for kind in ("income", "expenses")):
+        json.dump(data_to_save, file, indent=4)
+        return
+    # same layout as json.dump(..., indent=4), but columnar transactions are written one
+    # item at a time so they are never expanded into a full list of dicts
+    file.write("{")
+    for i, (key, value) in enumerate(data_to_save.items()):
+        file.write(("," if i else "") + "\n    " + json.dumps(key) + ": ")
+        if key in ("income", "expenses"):
+            file.write("[")
+            for j, tx in enumerate(value):
+                file.write(("," if j else "") + "\n        " + json.dumps(tx, indent=4).replace("\n", "\n        "))
+            file.write("\n    ]" if len(value) else "]")
+        else:
+            file.write(json.dumps(value, indent=4).replace("\n", "\n    "))
+    file.write("\n}")
+
+@perf.timed("save_data")
+def save_data(data_to_save):
+    if STORAGE_MODE == "sqlite":
+        # transactions are inserted as they are added, only commit them with the metadata
+        sqlite_store.save_meta(sqlite_store_conn(data_to_save), data_to_save)
+        return
+    if STORAGE_MODE == "shards":
+        store = shard_store(data_to_save)
+        with saver_cond:
+            snapshot = store.snapshot(settings_of(data_to_save))
+        with save_lock:
+            try:
+                store.save(snapshot)
+            except Exception as e:
+                print(f"Save error: {e}")
+        return
+    if STORAGE_MODE == "binary":
+        with save_lock:
+            try:
+                binfile.write_binary(data_to_save, BIN_FILE)
+            except Exception as e:
+                print(f"Save error: {e}")
+        return
+    if STORAGE_MODE == "journal":
+        with journal_lock:
+            write_snapshot(data_to_save, journal_state["seq"])
+            journal_state["snapshot_seq"] = journal_state["seq"]
+            clear_journal()
+        return
+    with save_lock:
+        write_snapshot(data_to_save)
+
+def write_snapshot(snapshot, seq=None, path=DATA_FILE):
+    # temp file + rename: a crash mid-write leaves the previous file intact, never a truncated one
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            dump_data(snapshot if seq is None else {**snapshot, "journal_seq": seq}, file)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Save error: {e}")
+
+def snapshot_data(data):
+    # transaction dicts are never edited once added (a category move replaces them), so
+    # copying the sequences is enough
+    snapshot = {**data, "categories": {k: list(v) for k, v in data["categories"].items()}}
+    if sqlite_store_conn(data) is None and shard_store(data) is None:
+        snapshot["income"] = data["income"].copy()
+        snapshot["expenses"] = data["expenses"].copy()
+    return snapshot
+
+# --- Write-Behind Saver ---
+# In "json" and "sqlite" mode commit() only marks the data dirty; a background thread waits
+# SAVE_DELAY for the rest of a burst of edits and then saves once. flush_saves() runs at exit.
+SAVE_DELAY = float(os.getenv("FINELY_SAVE_DELAY", "0.5"))
+
+# guards in-memory mutations against the saver taking its snapshot
+saver_cond = threading.Condition()
+saver_state = {"data": None, "dirty": False, "thread": None}
+# one writer at a time for data.json (saver thread, flush at exit, direct save_data calls)
+save_lock = threading.RLock()
+
+def schedule_save(data):
+    with saver_cond:
+        saver_state["data"] = data
+        saver_state["dirty"] = True
+        if saver_state["thread"] is None:
+            saver_state["thread"] = threading.Thread(target=saver_loop, name="finely-saver", daemon=True)
+            saver_state["thread"].start()
+        saver_cond.notify()
+
+def saver_loop():
+    while True:
+        with saver_cond:
+            while not saver_state["dirty"]:
+                saver_cond.wait()
+        time.sleep(SAVE_DELAY)
+        flush_saves()
+
+def flush_saves():
+    with save_lock:
+        with saver_cond:
+            if not saver_state["dirty"]:
+                return
+            saver_state["dirty"] = False
+            snapshot = snapshot_data(saver_state["data"])
+        save_data(snapshot)
+
+atexit.register(flush_saves)
+
+# --- SQLite ---
+def load_sqlite_data():
+    conn, created = sqlite_store.open_database(DB_FILE)
+    if created:
+        # one-time migration of the existing data.json (and journal) into data.db
+        sqlite_store.import_data(conn, load_json_data())
+    return sqlite_store.build_data(conn, default_data)
+
+def sqlite_store_conn(data):
+    income = data["income"]
+    return income.conn if isinstance(income, sqlite_store.SQLiteTransactions) else None
+
+# --- Binary File ---
+def load_binary_data():
+    if not os.path.exists(BIN_FILE):
+        # one-time conversion of the existing data.json (and journal); data.json stays as a backup
+        data = load_json_data()
+        try:
+            binfile.write_binary(data, BIN_FILE)
+        except Exception as e:
+            print(f"Save error: {e}")
+            return data
+    try:
+        data = binfile.read_binary(BIN_FILE)
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return copy.deepcopy(default_data)
+    for key, value in default_data.items():
+        if key not in data:
+            data[key] = copy.deepcopy(value)
+    for cat_type in default_data["categories"]:
+        data["categories"].setdefault(cat_type, list(default_data["categories"][cat_type]))
+    return data
+
+# --- Month Shards ---
+def load_shard_data():
+    store = ShardStore(SHARD_DIR, RECENT_MONTHS)
+    if not store.exists():
+        # one-time migration of the existing data.json (and journal); data.json stays as a backup
+        data = load_json_data()
+        for kind in ("income", "expenses"):
+            for tx in data[kind]:
+                store.add(kind, tx)
+        store.save(store.snapshot(settings_of(data)))
+        store = ShardStore(SHARD_DIR, RECENT_MONTHS)
+    try:
+        store.open()
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return copy.deepcopy(default_data)
+    data = {**copy.deepcopy(default_data), **store.settings, **store.views}
+    for cat_type in default_data["categories"]:
+        data["categories"].setdefault(cat_type, list(default_data["categories"][cat_type]))
+    return data
+
+def shard_store(data):
+    income = data["income"]
+    return income.store if isinstance(income, ShardedTransactions) else None
+
+def settings_of(data):
+    return {key: value for key, value in data.items() if key not in ("income", "expenses")}
+
+def load_history(data):
+    # read the older months of a sharded store; True if rows were added (and row numbers moved)
+    store = shard_store(data)
+    if store is None or not store.load_history():
+        return False
+    cached = index_cache.get(id(data))
+    if cached:
+        # both are keyed by row number; aggregates come from the manifest and stay valid
+        cached[1].pop("search", None)
+        cached[1].pop("order", None)
+    return True
+
+def has_history(data):
+    store = shard_store(data)
+    return store is not None and bool(store.unloaded_months())
+
+# --- Journal ---
+def apply_entry(data, entry):
+    op = entry["op"]
+    if op == "add":
+        store = shard_store(data)
+        if store and store.needs_history(entry["tx"]):
+            load_history(data)
+        data[entry["kind"]].append(entry["tx"])
+        cached = index_cache.get(id(data))
+        if cached:
+            # row numbers are only used by in-memory indexes, which SQLite never builds
+            row = None if sqlite_store_conn(data) else len(data[entry["kind"]]) - 1
+            for index in cached[1].values():
+                index.add_tx(entry["kind"], entry["tx"], row)
+    elif op == "add_cat":
+        data["categories"][entry["kind"]].append(entry["name"])
+    elif op == "delete_cat":
+        if entry["name"] in data["categories"][entry["kind"]]:
+            data["categories"][entry["kind"]].remove(entry["name"])
+    elif op == "move_cat":
+        move_category(data, entry["kind"], entry["name"], entry["to"])
+    elif op == "set":
+        data[entry["key"]] = entry["value"]
+
+def move_category(data, kind, old, new):
+    # every transaction in old goes to new; a rename if new is not a category yet, else a merge
+    if old == new:
+        return
+    names = data["categories"][kind]
+    if new in names:
+        if old in names:
+            names.remove(old)
+    elif old in names:
+        names[names.index(old)] = new
+    else:
+        names.append(new)
+
+    store = shard_store(data)
+    txs = data[kind]
+    if store:
+        load_history(data)
+        store.recategorize(kind, old, new)
+    elif hasattr(txs, "recategorize"):
+        # columnar: edit the name table; SQLite: one indexed UPDATE
+        txs.recategorize(old, new)
+    else:
+        for row, tx in enumerate(txs):
+            if tx["category"] == old:
+                # a new dict, never an edit: snapshots being saved still hold the old ones
+                txs[row] = {**tx, "category": new}
+
+    cached = index_cache.get(id(data))
+    if cached:
+        indexes = cached[1]
+        for name in ("aggregates", "daily"):
+            if name in indexes:
+                indexes[name].recategorize(kind, old, new)
+        # the search index holds lowercased category strings per row
+        indexes.pop("search", None)
+
+def clear_journal():
+    journal_state["entries"] = 0
+    for path in (JOURNAL_FILE, JOURNAL_COMPACTING_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+def replay_journal(data, since_seq):
+    found = False
+    for path in (JOURNAL_COMPACTING_FILE, JOURNAL_FILE):
+        if not os.path.exists(path):
+            continue
+        found = True
+        with open(path, "rb") as file:
+            content = file.read()
+        complete = content.rfind(b"\n") + 1
+        if complete < len(content):
+            # a torn last line from a crash mid-append; cut it off, or the next append would
+            # carry on the same line and be lost with it on the next replay
+            print(f"Skipping broken journal line in {path}")
+            with open(path, "r+b") as file:
+                file.truncate(complete)
+        for line in content[:complete].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print(f"Skipping broken journal line in {path}")
+                continue
+            if entry["seq"] <= since_seq:
+                continue
+            apply_entry(data, entry)
+            journal_state["seq"] = entry["seq"]
+            if path == JOURNAL_FILE:
+                journal_state["entries"] += 1
+    return found
+
+def append_entry(data, entry):
+    append_entries(data, [entry])
+
+def append_entries(data, entries):
+    with journal_lock:
+        lines = []
+        for entry in entries:
+            journal_state["seq"] += 1
+            entry["seq"] = journal_state["seq"]
+            lines.append(json.dumps(entry, separators=(",", ":")) + "\n")
+        try:
+            with open(JOURNAL_FILE, "a", encoding="utf-8") as file:
+                file.writelines(lines)
+        except Exception as e:
+            print(f"Journal error: {e}")
+        journal_state["entries"] += len(entries)
+        if journal_state["entries"] >= JOURNAL_COMPACT_THRESHOLD and not journal_state["compacting"]:
+            start_compaction(data)
+
+def start_compaction(data):
+    # called with journal_lock held; rotate the journal and snapshot in the background
+    if os.path.exists(JOURNAL_COMPACTING_FILE) or not os.path.exists(JOURNAL_FILE):
+        return
+    os.replace(JOURNAL_FILE, JOURNAL_COMPACTING_FILE)
+    journal_state["entries"] = 0
+    journal_state["compacting"] = True
+    snapshot = snapshot_data(data)
+    seq = journal_state["seq"]
+    threading.Thread(target=compact_journal, args=(snapshot, seq), name="finely-compaction").start()
+
+def compact_journal(snapshot, seq):
+    tmp_path = DATA_FILE + ".compact.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            dump_data({**snapshot, "journal_seq": seq}, file)
+        with journal_lock:
+            # save_data() may have written a newer snapshot in the meantime
+            if journal_state["snapshot_seq"] < seq:
+                os.replace(tmp_path, DATA_FILE)
+                journal_state["snapshot_seq"] = seq
+            if os.path.exists(JOURNAL_COMPACTING_FILE):
+                os.remove(JOURNAL_COMPACTING_FILE)
+    except Exception as e:
+        print(f"Compaction error: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        journal_state["compacting"] = False
+
+# --- Mutations ---
+def commit(data, entry):
+    if STORAGE_MODE == "journal":
+        apply_entry(data, entry)
+        append_entry(data, entry)
+        return
+    with saver_cond:
+        apply_entry(data, entry)
+    schedule_save(data)
+
+def commit_batch(data, entries):
+    # many changes with one persist and one aggregate update instead of one per change
+    with saver_cond:
+        apply_batch(data, entries)
+    if STORAGE_MODE == "journal":
+        append_entries(data, entries)
+    elif STORAGE_MODE == "sqlite":
+        save_data(data)
+    # the file-rewriting modes ("json", "binary", "shards") are saved once at the end by bulk callers
+
+def apply_batch(data, entries):
+    store = shard_store(data)
+    if store and any(entry["op"] == "add" and store.needs_history(entry["tx"]) for entry in entries):
+        load_history(data)
+    added = {"income": [], "expenses": []}
+    for entry in entries:
+        if entry["op"] == "add":
+            added[entry["kind"]].append(entry["tx"])
+        else:
+            apply_entry(data, entry)
+
+    cached = index_cache.get(id(data))
+    indexes = cached[1] if cached else {}
+    batch_agg = Aggregates()
+    for kind, txs in added.items():
+        if not txs:
+            continue
+        first_row = len(data[kind])
+        data[kind].extend(txs)
+        for i, tx in enumerate(txs):
+            batch_agg.add_tx(kind, tx)
+            if "search" in indexes:
+                indexes["search"].add_tx(kind, tx, first_row + i)
+    if "aggregates" in indexes:
+        indexes["aggregates"].merge(batch_agg)
+    if any(added.values()):
+        # re-sorting once on next use beats a bisect insert per row
+        indexes.pop("order", None)
+        indexes.pop("daily", None)
+
+def add_transaction(data, kind, tx):
+    commit(data, {"op": "add", "kind": kind, "tx": tx})
+
+def add_category(data, cat_type, name):
+    commit(data, {"op": "add_cat", "kind": cat_type, "name": name})
+
+def delete_category(data, cat_type, name, reassign_to=None):
+    if reassign_to:
+        commit(data, {"op": "move_cat", "kind": cat_type, "name": name, "to": reassign_to})
+    else:
+        commit(data, {"op": "delete_cat", "kind": cat_type, "name": name})
+
+def rename_category(data, cat_type, old, new):
+    # merging into an existing category is a rename onto a taken name
+    commit(data, {"op": "move_cat", "kind": cat_type, "name": old, "to": new})
+
+def category_in_use(data, cat_type, name):
+    return get_aggregates(data).by_category[cat_type].get(name, 0.0) > 0
+
+def set_setting(data, key, value):
+    commit(data, {"op": "set", "key": key, "value": value})
+
+# --- Derived Indexes ---
+# Built on first use per loaded dataset and updated by apply_entry() on every add.
+# id(data) -> (data, {name: index}); holding data keeps its id from being reused
+index_cache = {}
+
+def build_aggregates(data):
+    conn = sqlite_store_conn(data)
+    if conn:
+        return Aggregates.from_sums(sqlite_store.month_category_sums(conn))
+    store = shard_store(data)
+    if store:
+        # the manifest already has per-month category totals, including unread months
+        return Aggregates.from_sums(store.sums())
+    if isinstance(data["income"], TransactionColumns):
+        # vectorized group-by over the columns
+        return Aggregates.from_sums(
+            data["income"].month_category_sums() + data["expenses"].month_category_sums()
+        )
+    return Aggregates.from_data(data)
+
+def build_daily_sums(data):
+    conn = sqlite_store_conn(data)
+    if conn:
+        return DailySums.from_sums(sqlite_store.day_category_sums(conn))
+    # the manifest only has months; day-level sums need every shard
+    load_history(data)
+    if isinstance(data["income"], TransactionColumns):
+        return DailySums.from_sums(data["income"].day_category_sums() + data["expenses"].day_category_sums())
+    return DailySums.from_data(data)
+
+INDEX_BUILDERS = {
+    "aggregates": build_aggregates,
+    "search": SearchIndex.from_data,
+    "order": OrderIndex.from_data,
+    "daily": build_daily_sums,
+}
+
+def get_index(data, name):
+    cached = index_cache.get(id(data))
+    if cached is None:
+        cached = index_cache[id(data)] = (data, {})
+    indexes = cached[1]
+    if name not in indexes:
+        indexes[name] = INDEX_BUILDERS[name](data)
+    return indexes[name]
+
+def get_aggregates(data):
+    return get_index(data, "aggregates")
+
+# --- Queries ---
+def transaction_totals(data):
+    totals = get_aggregates(data).totals
+    return totals["income"], totals["expenses"]
+
+def report_summary(data):
+    agg = get_aggregates(data)
+    return agg.monthly, agg.by_category["income"], agg.by_category["expenses"]
+
+def range_summary(data, start=None, end=None):
+    # (income, expenses, monthly, income by category, expenses by category) for an inclusive
+    # date range; all time comes from the aggregates, anything else from the daily sums
+    if start is None and end is None:
+        monthly, income_by_cat, expense_by_cat = report_summary(data)
+        return (*transaction_totals(data), monthly, income_by_cat, expense_by_cat)
+    daily = get_index(data, "daily")
+    return (
+        daily.total("income", start, end),
+        daily.total("expenses", start, end),
+        daily.monthly(start, end),
+        daily.category_totals("income", start, end),
+        daily.category_totals("expenses", start, end),
+    )
+
+TX_TYPES = {"income": "income", "expenses": "expense"}
+
+class TransactionResults:
+    # matching rows as (type, tx) pairs; dicts are only built for the slice shown.
+    # streams: one (bit, rows, from_end) per kind, rows already in the requested order (read
+    # back to front when from_end). Rows are found by position without copying them, except
+    # when two sorted kinds have to be interleaved: then only as much of the merge as the
+    # pages asked for so far is pulled, encoded as row << 1 | is_expense
+    def __init__(self, txs, streams, merge_key=None, descending=False):
+        # txs: kind -> the rows the row numbers refer to, see pinned_rows()
+        self.txs = txs
+        self.streams = streams
+        self.total = sum(len(rows) for _, rows, _ in streams)
+        self.merged = None
+        if merge_key and len(streams) > 1:
+            self.merged = array("Q")
+            self.merging = heapq.merge(
+                *(encode_rows(reversed(rows) if from_end else rows, bit) for bit, rows, from_end in streams),
+                key=merge_key, reverse=descending,
+            )
+
+    def fetch(self, count):
+        if self.merged is not None and count > len(self.merged):
+            self.merged.extend(itertools.islice(self.merging, count - len(self.merged)))
+
+    def code(self, index):
+        if self.merged is not None:
+            return self.merged[index]
+        for bit, rows, from_end in self.streams:
+            if index < len(rows):
+                return (rows[len(rows) - 1 - index if from_end else index] << 1) | bit
+            index -= len(rows)
+
+    def resolve(self, code):
+        kind = "expenses" if code & 1 else "income"
+        return TX_TYPES[kind], self.txs[kind][code >> 1]
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(*index.indices(self.total))
+            if positions:
+                self.fetch(max(positions[0], positions[-1]) + 1)
+            return [self.resolve(self.code(i)) for i in positions]
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError("transaction index out of range")
+        self.fetch(index + 1)
+        return self.resolve(self.code(index))
+
+    def __iter__(self):
+        self.fetch(self.total)
+        return map(self.__getitem__, range(self.total))
+
+def encode_rows(rows, bit):
+    return ((row << 1) | bit for row in rows)
+
+def pinned_rows(txs):
+    # reading older months swaps a new, renumbered list into a sharded view; results keep the
+    # list they were numbered against (later adds still land at its end)
+    return txs.rows if isinstance(txs, ShardedTransactions) else txs
+
+def find_transactions(data, tx_type="all", query="", sort=None, cancelled=None):
+    # returns a sequence of (type, tx) pairs; tx is built from the store only when accessed
+    conn = sqlite_store_conn(data)
+    if conn:
+        return sqlite_store.find_transactions(conn, tx_type, query, sort)
+    if query or sort not in (None, "newest"):
+        # newest-first paging is served by the recent months; anything else needs them all
+        load_history(data)
+
+    field, descending = SORTS.get(sort, (None, False))
+    streams = []
+    key_columns = {}
+    pinned = {}
+    for bit, (kind, type_) in enumerate(TX_TYPES.items()):
+        if tx_type in ("income", "expense") and tx_type != type_:
+            continue
+        txs = pinned[kind] = pinned_rows(data[kind])
+        if field:
+            key_columns[bit] = key_column(txs, field)
+        if query:
+            rows = get_index(data, "search").search(kind, query)
+            if field:
+                rows.sort(key=key_columns[bit].__getitem__, reverse=descending)
+            streams.append((bit, rows, False))
+        elif field:
+            streams.append((bit, get_index(data, "order").ordered_rows(kind, field), descending))
+        else:
+            streams.append((bit, range(len(txs)), False))
+
+    # a newer query arrived while this one ran, skip building its result
+    if cancelled and cancelled():
+        return None
+
+    merge_key = (lambda code: key_columns[code & 1][code >> 1]) if field else None
+    return TransactionResults(pinned, streams, merge_key, descending)
+
+def tx_position(data, kind, tx, tx_type="all", query="", sort=None):
+    # where the transaction just added to data[kind] lands in find_transactions(tx_type, query,
+    # sort), worked out from the indexes instead of running the query; None if it doesn't match
+    if tx_type not in ("all", TX_TYPES[kind]):
+        return None
+    label = tx.get("source", tx.get("description", ""))
+    if query and query not in label.lower() and query not in tx["category"].lower():
+        return None
+    conn = sqlite_store_conn(data)
+    if conn:
+        return sqlite_store.tx_position(conn, data[kind].row_id(tx), tx_type, query, sort)
+
+    field, descending = SORTS.get(sort, (None, False))
+    own_bit = list(TX_TYPES).index(kind)
+    position = 0
+    for bit, (other, type_) in enumerate(TX_TYPES.items()):
+        if tx_type not in ("all", type_) or (not field and bit > own_bit):
+            continue
+        own = bit == own_bit
+        hits = get_index(data, "search").search(other, query) if query else None
+        if not field:
+            # unsorted: income rows, then expense rows, each in insertion order
+            position += len(hits) if hits is not None else len(data[other])
+            position -= own
+            continue
+        key = sort_key(data[kind], tx, field)
+        # equal keys: the merge puts income before expenses, and within its own kind the new
+        # row is the newest, so last among equals unless an order index is read backwards
+        ties_before = bit < own_bit or (own and (hits is not None or not descending))
+        if hits is None:
+            position += get_index(data, "order").rank(other, field, key, descending, ties_before)
+        else:
+            keys = key_column(data[other], field)
+            position += sum(1 for row in hits
+                            if (keys[row] > key if descending else keys[row] < key)
+                            or (ties_before and keys[row] == key))
+        if own and ties_before:
+            # it counted itself
+            position -= 1
+    return position
+
+def transaction_count(data, tx_type="all"):
+    # every transaction of the type, counting the months a sharded store hasn't read yet
+    store = shard_store(data)
+    return sum(store.count(kind) if store else len(data[kind])
+               for kind, type_ in TX_TYPES.items() if tx_type in ("all", type_))
@@ -0,0 +1,220 @@
+import atexit
+import copy
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+from finely import storage
+from finely.storage import (
+    DATA_DIR, COLUMNAR, SAVE_DELAY, default_data, read_data_file, to_columns, apply_entry,
+    snapshot_data, write_snapshot, has_history
+)
+
+# --- Shared Stores ---
+# Every Flet session works through a Store instead of touching the data dict directly, so
+# several sessions (web tabs or users in server mode) can share one loaded profile safely:
+# queries run concurrently under the read lock, changes one at a time under the write lock.
+# Sessions on the same profile share its data, so they also share the derived indexes in
+# storage.index_cache and the rendered chart PNGs in Store.charts.
+#
+# The desktop store persists through storage's FINELY_STORAGE mode as before. Server
+# profiles are one data.json each under DATA_DIR/profiles/<name>/ with their own
+# write-behind saver.
+
+PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
+PROFILE_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")
+DEFAULT_PROFILE = "default"
+
+class RWLock:
+    # many readers or one writer; a waiting writer holds off new readers so adds never starve.
+    # Not reentrant: never take it again while holding it
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self.cond:
+            while self.writer or self.waiting_writers:
+                self.cond.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.readers -= 1
+                if not self.readers:
+                    self.cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self.cond:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.cond.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.cond:
+                self.writer = False
+                self.cond.notify_all()
+
+class Store:
+    def __init__(self, name, path=None):
+        # path=None: the desktop data dir, persisted by storage's FINELY_STORAGE mode
+        self.name = name
+        self.path = path
+        self.dir = DATA_DIR if path is None else os.path.dirname(path)
+        self.lock = RWLock()
+        self.data = None
+        # profile saver state, see commit() and flush()
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.timer = None
+        # chart cache path -> PNG bytes, reused by every session viewing this profile
+        self.charts = {}
+
+    def open(self, data=None):
+        if data is not None:
+            self.data = data
+        elif self.path is None:
+            self.data = storage.load_data()
+        else:
+            self.data = read_data_file(self.path) or copy.deepcopy(default_data)
+            if COLUMNAR:
+                to_columns(self.data)
+        return self
+
+    # --- Changes ---
+    def commit(self, entry):
+        with self.lock.write():
+            if self.path is None:
+                storage.commit(self.data, entry)
+                return
+            apply_entry(self.data, entry)
+            self.dirty = True
+            if self.timer is None:
+                self.timer = threading.Timer(SAVE_DELAY, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self):
+        if self.path is None:
+            storage.flush_saves()
+            return
+        with self.save_lock:
+            # the snapshot only needs writers kept out; sessions keep reading meanwhile
+            with self.lock.read():
+                self.timer = None
+                if not self.dirty:
+                    return
+                self.dirty = False
+                snapshot = snapshot_data(self.data)
+            write_snapshot(snapshot, path=self.path)
+
+    def add_transaction(self, kind, tx):
+        self.commit({"op": "add", "kind": kind, "tx": tx})
+
+    def add_category(self, cat_type, name):
+        self.commit({"op": "add_cat", "kind": cat_type, "name": name})
+
+    def delete_category(self, cat_type, name, reassign_to=None):
+        if reassign_to:
+            self.commit({"op": "move_cat", "kind": cat_type, "name": name, "to": reassign_to})
+        else:
+            self.commit({"op": "delete_cat", "kind": cat_type, "name": name})
+
+    def rename_category(self, cat_type, old, new):
+        self.commit({"op": "move_cat", "kind": cat_type, "name": old, "to": new})
+
+    def set_setting(self, key, value):
+        self.commit({"op": "set", "key": key, "value": value})
+
+    # --- Queries ---
+    def load_history(self):
+        # reading older month shards renumbers rows, so it is a write as far as readers go
+        if not has_history(self.data):
+            return False
+        with self.lock.write():
+            return storage.load_history(self.data)
+
+    # results are copied under the lock: the live aggregates change with every commit, and
+    # callers walk them (charts, cache keys, the Reports warm-up) long after it is released
+    def get_aggregates(self):
+        with self.lock.read():
+            return storage.get_aggregates(self.data).copy()
+
+    def data_version(self, kind=None):
+        with self.lock.read():
+            agg = storage.get_aggregates(self.data)
+            return agg.version if kind is None else agg.kind_versions[kind]
+
+    def transaction_totals(self):
+        with self.lock.read():
+            return storage.transaction_totals(self.data)
+
+    def range_summary(self, start=None, end=None):
+        if start or end:
+            # day-level sums are built from every shard
+            self.load_history()
+        with self.lock.read():
+            income, expenses, monthly, income_by_cat, expense_by_cat = storage.range_summary(self.data, start, end)
+            return (income, expenses, {month: dict(sums) for month, sums in monthly.items()},
+                    dict(income_by_cat), dict(expense_by_cat))
+
+    def find_transactions(self, tx_type="all", query="", sort=None, cancelled=None):
+        if query or sort not in (None, "newest"):
+            self.load_history()
+        with self.lock.read():
+            # the result resolves rows lazily after the lock is released. That stays valid:
+            # adds only append, and in shards mode the result keeps the row lists it was
+            # numbered against when load_history() swaps in renumbered ones
+            return storage.find_transactions(self.data, tx_type, query, sort, cancelled)
+
+    def tx_position(self, kind, tx, tx_type="all", query="", sort=None):
+        with self.lock.read():
+            return storage.tx_position(self.data, kind, tx, tx_type, query, sort)
+
+    def transaction_count(self, tx_type="all"):
+        with self.lock.read():
+            return storage.transaction_count(self.data, tx_type)
+
+    def category_in_use(self, cat_type, name):
+        with self.lock.read():
+            return storage.category_in_use(self.data, cat_type, name)
+
+# --- Registry ---
+stores = {}
+stores_lock = threading.Lock()
+
+def desktop_store(data=None):
+    with stores_lock:
+        if None not in stores:
+            stores[None] = Store("desktop").open(data)
+        return stores[None]
+
+def get_store(profile):
+    # the shared Store for a server profile, loaded on first use
+    if not PROFILE_NAME.fullmatch(profile or ""):
+        raise ValueError(f"invalid profile name '{profile}'")
+    with stores_lock:
+        store = stores.get(profile)
+        if store is None:
+            directory = os.path.join(PROFILE_DIR, profile)
+            os.makedirs(directory, exist_ok=True)
+            store = stores[profile] = Store(profile, os.path.join(directory, "data.json")).open()
+        return store
+
+def flush_stores():
+    for store in list(stores.values()):
+        try:
+            store.flush()
+        except Exception as e:
+            print(f"Save error ({store.name}): {e}")
+
+atexit.register(flush_stores)
@@ -0,0 +1,128 @@
+import calendar
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+# --- Daily Sums ---
+# Per type: the distinct days in order and running totals up to each day, overall and per
+# category. Any date range is then two bisects and a subtraction, however long the history.
+KINDS = ("income", "expenses")
+
+# report period -> label, for the Reports picker and the CLI
+PERIODS = {
+    "all": "All time",
+    "30d": "Last 30 days",
+    "quarter": "This quarter",
+    "custom": "Custom",
+}
+
+def period_bounds(period, today=None):
+    # inclusive ("YYYY-MM-DD", "YYYY-MM-DD") for a preset period, (None, None) for all time
+    today = today or date.today()
+    if period == "30d":
+        return (today - timedelta(days=29)).isoformat(), today.isoformat()
+    if period == "quarter":
+        first_month = (today.month - 1) // 3 * 3 + 1
+        last_month = first_month + 2
+        last_day = calendar.monthrange(today.year, last_month)[1]
+        return date(today.year, first_month, 1).isoformat(), date(today.year, last_month, last_day).isoformat()
+    return None, None
+
+def next_month(month):
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+class DailySums:
+    def __init__(self):
+        self.days = {kind: [] for kind in KINDS}
+        # cumulative[i] = sum over days[:i], so every array is one longer than days
+        self.totals = {kind: array("d", [0.0]) for kind in KINDS}
+        self.by_category = {kind: {} for kind in KINDS}
+
+    def add(self, kind, day, category, amount):
+        days = self.days[kind]
+        totals = self.totals[kind]
+        categories = self.by_category[kind]
+        pos = bisect_left(days, day)
+        if pos == len(days) or days[pos] != day:
+            days.insert(pos, day)
+            for cumulative in (totals, *categories.values()):
+                cumulative.insert(pos + 1, cumulative[pos])
+        if category not in categories:
+            categories[category] = array("d", [0.0]) * (len(days) + 1)
+        # appends touch one entry; a backdated day shifts the totals after it
+        for cumulative in (totals, categories[category]):
+            for i in range(pos + 1, len(cumulative)):
+                cumulative[i] += amount
+
+    def add_tx(self, kind, tx, row=None):
+        self.add(kind, tx["date"], tx["category"], tx["amount"])
+
+    def recategorize(self, kind, old, new):
+        categories = self.by_category[kind]
+        moved = categories.pop(old, None)
+        if moved is None:
+            return
+        target = categories.get(new)
+        if target is None:
+            categories[new] = moved
+        else:
+            for i, amount in enumerate(moved):
+                target[i] += amount
+
+    def span(self, kind, start=None, end=None):
+        days = self.days[kind]
+        return (bisect_left(days, start) if start else 0,
+                bisect_right(days, end) if end else len(days))
+
+    def total(self, kind, start=None, end=None):
+        i, j = self.span(kind, start, end)
+        return self.totals[kind][j] - self.totals[kind][i] if j > i else 0.0
+
+    def category_totals(self, kind, start=None, end=None):
+        i, j = self.span(kind, start, end)
+        if j <= i:
+            return {}
+        result = {}
+        for category, cumulative in self.by_category[kind].items():
+            amount = cumulative[j] - cumulative[i]
+            # amounts are positive; anything this small is rounding left by the subtraction
+            if amount > 1e-9:
+                result[category] = amount
+        return result
+
+    def monthly(self, start=None, end=None):
+        # {"YYYY-MM": {"income": x, "expenses": y}} for months with activity in the range
+        days = [d for kind in KINDS for d in self.days[kind][:1] + self.days[kind][-1:]]
+        if not days:
+            return {}
+        start = max(start or min(days), min(days))
+        end = min(end or max(days), max(days))
+        result = {}
+        month = start[:7]
+        while month <= end[:7]:
+            lo = max(start, month + "-01")
+            # "-31" sorts after every real day of the month
+            hi = min(end, month + "-31")
+            sums = {kind: self.total(kind, lo, hi) for kind in KINDS}
+            if any(sums.values()):
+                result[month] = sums
+            month = next_month(month)
+        return result
+
+    @classmethod
+    def from_sums(cls, rows):
+        # rows of (kind, "YYYY-MM-DD", category, amount); sorted first so every add appends
+        sums = cls()
+        for kind, day, category, amount in sorted(rows, key=lambda row: row[1]):
+            sums.add(kind, day, category, amount)
+        return sums
+
+    @classmethod
+    def from_data(cls, data):
+        grouped = {}
+        for kind in KINDS:
+            for tx in data[kind]:
+                key = (kind, tx["date"], tx["category"])
+                grouped[key] = grouped.get(key, 0.0) + tx["amount"]
+        return cls.from_sums([(kind, day, category, amount) for (kind, day, category), amount in grouped.items()])